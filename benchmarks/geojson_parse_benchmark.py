@@ -0,0 +1,49 @@
+"""
+Geojson parse benchmark measures the json parse phase of the geojson import with each available json backend
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+
+Usage: python benchmarks/geojson_parse_benchmark.py [--features 200000] [--vertices 12]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from benchmarks.synthetic_district import write_synthetic_geojson
+from imports.geometry.helpers.geojson_feature_reader import GeojsonFeatureReader, JSON_BACKENDS
+
+
+def main():
+  """
+  Run the benchmark
+  :return: None
+  """
+  parser = argparse.ArgumentParser(description='Geojson parse phase benchmark')
+  parser.add_argument('--features', type=int, default=200000)
+  parser.add_argument('--vertices', type=int, default=12)
+  args = parser.parse_args()
+  with tempfile.TemporaryDirectory() as folder:
+    path = Path(folder) / 'synthetic.geojson'
+    write_synthetic_geojson(path, args.features, args.vertices)
+    print(f'{args.features} features, {path.stat().st_size / 2 ** 20:.1f} MB')
+
+    start = time.perf_counter()
+    with open(path, 'r', encoding='utf8') as geojson_file:
+      features = len(json.load(geojson_file)['features'])
+    print(f'{"json.load whole file":<28}{time.perf_counter() - start:8.2f} s  {features} features')
+
+    for backend in JSON_BACKENDS:
+      start = time.perf_counter()
+      features = sum(1 for _ in GeojsonFeatureReader(path, json_backend=backend))
+      print(f'{"reader " + backend:<28}{time.perf_counter() - start:8.2f} s  {features} features')
+
+
+if __name__ == '__main__':
+  main()
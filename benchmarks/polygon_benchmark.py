@@ -0,0 +1,123 @@
+"""
+Polygon benchmark measures the polygon normal and area on wall quads and 100 vertex footprints
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+
+Usage: python benchmarks/polygon_benchmark.py [--polygons 2000]
+"""
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from helpers.attributes.polygon import Polygon
+
+
+def _angle_between_vectors(vector_1, vector_2):
+  cosine = np.dot(vector_1, vector_2) / np.linalg.norm(vector_1) / np.linalg.norm(vector_2)
+  return math.acos(min(1, max(-1, cosine)))
+
+
+def _angle(vector_1, vector_2, cross_product):
+  cross_product_next = np.cross(vector_1, vector_2)
+  if np.linalg.norm(cross_product_next) == 0:
+    return 0
+  cross_product_next = cross_product_next / np.linalg.norm(cross_product_next)
+  alpha = _angle_between_vectors(vector_1, vector_2)
+  if abs(sum(cross_product - cross_product_next)) < 0.01:
+    return alpha
+  return -alpha
+
+
+def angle_accumulation_normal(points):
+  """
+  Previous Polygon.normal, the orientation is found accumulating the angles between the vertices
+  :param points: polygon coordinates
+  :return: np.ndarray
+  """
+  point_origin = points[len(points) - 2]
+  vector_1 = points[len(points) - 1] - point_origin
+  vector_2 = points[0] - point_origin
+  vector_3 = points[1] - point_origin
+  cross_product = np.cross(vector_1, vector_2)
+  cross_product = cross_product / np.linalg.norm(cross_product)
+  alpha = _angle_between_vectors(vector_1, vector_2)
+  if len(points) == 3:
+    return cross_product
+  alpha += _angle(vector_2, vector_3, cross_product)
+  for i in range(0, len(points) - 4):
+    alpha += _angle(points[i + 1] - point_origin, points[i + 2] - point_origin, cross_product)
+  if alpha < 0:
+    cross_product = np.cross(vector_2, vector_1)
+  else:
+    cross_product = np.cross(vector_1, vector_2)
+  return cross_product / np.linalg.norm(cross_product)
+
+
+def triangulated_area(points):
+  """
+  Previous Polygon.area, the polygon is triangulated and the area of its triangles added
+  :param points: polygon coordinates
+  :return: float
+  """
+  area = 0
+  for face in Polygon.triangle_mesh(points, angle_accumulation_normal(points)).faces:
+    triangle = points[face]
+    a_b = np.zeros(3)
+    a_c = np.zeros(3)
+    for i in range(0, 3):
+      a_b[i] = triangle[1][i] - triangle[0][i]
+      a_c[i] = triangle[2][i] - triangle[0][i]
+    area += np.linalg.norm(np.cross(a_b, a_c)) / 2
+  return area
+
+
+def _polygons(polygons):
+  random = np.random.default_rng(0)
+  walls = []
+  footprints = []
+  for _ in range(polygons):
+    x, y, width, height = random.uniform(0, 100, 4)
+    walls.append(np.array([[x, y, 0], [x + width, y, 0], [x + width, y, height], [x, y, height]]))
+    # star shaped footprint
+    angles = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+    radius = 10 + random.uniform(0, 3, 100)
+    footprints.append(np.column_stack((x + radius * np.cos(angles), y + radius * np.sin(angles), np.zeros(100))))
+  return walls, footprints
+
+
+def _time(function, coordinates):
+  start = time.perf_counter()
+  for polygon_coordinates in coordinates:
+    function(polygon_coordinates)
+  return time.perf_counter() - start
+
+
+def main():
+  """
+  Run the benchmark
+  :return: None
+  """
+  parser = argparse.ArgumentParser(description='Polygon normal and area benchmark')
+  parser.add_argument('--polygons', type=int, default=2000)
+  args = parser.parse_args()
+  walls, footprints = _polygons(args.polygons)
+  for name, coordinates in [('wall quads', walls), ('100 vertex footprints', footprints)]:
+    print(f'{args.polygons} {name}')
+    angles = _time(angle_accumulation_normal, coordinates)
+    newell = _time(lambda polygon_coordinates: Polygon(polygon_coordinates).normal, coordinates)
+    print(f'  normal  angle accumulation {angles:7.3f} s  newell {newell:7.3f} s  x{angles / newell:.1f}')
+    triangulated = _time(triangulated_area, coordinates)
+    newell = _time(lambda polygon_coordinates: Polygon(polygon_coordinates).area, coordinates)
+    print(f'  area    triangulation      {triangulated:7.3f} s  newell {newell:7.3f} s  x{triangulated / newell:.1f}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,44 @@
+"""
+Synthetic district writes the geojson feature collections measured by the benchmarks
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import json
+import math
+import random
+
+
+def write_synthetic_geojson(path, features, vertices, star=False):
+  """
+  Write a synthetic feature collection with regular, or star shaped so concave, building footprints around Cadiz
+  :param path: output file
+  :param features: number of features
+  :param vertices: number of vertices per footprint
+  :param star: True for star shaped footprints, the vertices radius changes randomly
+  :return: None
+  """
+  random.seed(0)
+  with open(path, 'w', encoding='utf8') as geojson_file:
+    geojson_file.write('{"type": "FeatureCollection", "name": "synthetic", "features": [\n')
+    for i in range(features):
+      longitude = -6.3 + random.random() * 0.1
+      latitude = 36.5 + random.random() * 0.05
+      ring = []
+      for j in range(vertices):
+        angle = 2 * math.pi * j / vertices
+        radius = 1e-4
+        if star:
+          radius *= 1 + 0.3 * random.random()
+        ring.append([longitude + radius * math.cos(angle), latitude + radius * math.sin(angle)])
+      ring.append(ring[0])
+      feature = {
+        'type': 'Feature',
+        'id': i,
+        'properties': {'height': random.randint(3, 30), 'yoc': random.randint(1900, 2020), 'feature_type': 'building'},
+        'geometry': {'type': 'Polygon', 'coordinates': [ring]}
+      }
+      if i > 0:
+        geojson_file.write(',\n')
+      json.dump(feature, geojson_file)
+    geojson_file.write('\n]}\n')
@@ -0,0 +1,106 @@
+"""
+Triangulation benchmark measures the triangulation of every surface of a district
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+
+Usage: python benchmarks/triangulation_benchmark.py [--path district.geojson] [--features 1000] [--vertices 24]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import trimesh.creation
+import trimesh.geometry
+from shapely.geometry.polygon import Polygon as shapley_polygon
+from trimesh import Trimesh
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from benchmarks.synthetic_district import write_synthetic_geojson
+from helpers.triangulation_helper import TriangulationHelper
+from imports.geometry_factory import GeometryFactory
+
+
+def engine_faces(vertices, normal):
+  """
+  Previous Polygon.triangle_mesh, every polygon is triangulated by the external engine
+  :return: np.ndarray
+  """
+  min_x = 1e16
+  min_y = 1e16
+  min_z = 1e16
+  for vertex in vertices:
+    min_x = min(min_x, vertex[0])
+    min_y = min(min_y, vertex[1])
+    min_z = min(min_z, vertex[2])
+  new_vertices = []
+  for vertex in vertices:
+    new_vertices.append([vertex[0] - min_x, vertex[1] - min_y, vertex[2] - min_z])
+  transformation_matrix = trimesh.geometry.plane_transform(origin=new_vertices[0], normal=normal)
+  coordinates = []
+  for vertex in vertices:
+    transformed_vertex = np.dot(transformation_matrix, [vertex[0] - min_x, vertex[1] - min_y, vertex[2] - min_z, 1])
+    coordinates.append([transformed_vertex[0], transformed_vertex[1]])
+  _, faces = trimesh.creation.triangulate_polygon(shapley_polygon(coordinates), engine='triangle')
+  mesh = Trimesh(vertices=vertices, faces=faces)
+  normal_sum = 0
+  for i in range(0, 3):
+    normal_sum += normal[i] + mesh.face_normals[0][i]
+  if abs(normal_sum) <= 1E-10:
+    mesh = Trimesh(vertices=vertices, faces=faces[:, ::-1])
+  return mesh.faces
+
+
+def main():
+  """
+  Run the benchmark
+  :return: None
+  """
+  parser = argparse.ArgumentParser(description='District surfaces triangulation benchmark')
+  parser.add_argument('--path', help='district geojson, a synthetic one is written if not given')
+  parser.add_argument('--features', type=int, default=1000)
+  parser.add_argument('--vertices', type=int, default=24)
+  args = parser.parse_args()
+  with tempfile.TemporaryDirectory() as folder:
+    path = args.path
+    if path is None:
+      path = Path(folder) / 'synthetic.geojson'
+      write_synthetic_geojson(path, args.features, args.vertices, star=True)
+    district = GeometryFactory('geojson', path=path, height_field='height', year_of_construction_field='yoc',
+                               type_field='feature_type').district
+  polygons = [surface.solid_polygon for building in district.buildings for surface in building.surfaces]
+  polygons = [(np.asarray(polygon.coordinates), polygon.normal) for polygon in polygons]
+  print(f'{len(district.buildings)} buildings, {len(polygons)} surfaces')
+
+  cache_size = TriangulationHelper.cache_info()['max_size']
+  TriangulationHelper.set_cache_size(0)
+  start = time.perf_counter()
+  native = [TriangulationHelper.triangulate(coordinates, normal) for coordinates, normal in polygons]
+  native_time = time.perf_counter() - start
+  engine_polygons = sum(1 for faces in native if faces is None)
+  print(f'{"native":<10}{native_time:8.3f} s  {engine_polygons} surfaces left to the engine')
+  TriangulationHelper.set_cache_size(cache_size)
+  TriangulationHelper.clear_cache()
+  start = time.perf_counter()
+  for coordinates, normal in polygons:
+    TriangulationHelper.triangulate(coordinates, normal)
+  cached_time = time.perf_counter() - start
+  info = TriangulationHelper.cache_info()
+  print(f'{"cached":<10}{cached_time:8.3f} s  x{native_time / cached_time:.1f}  {info["hits"]} hits {info["misses"]} misses')
+  try:
+    start = time.perf_counter()
+    for coordinates, normal in polygons:
+      engine_faces(coordinates, normal)
+    engine_time = time.perf_counter() - start
+    print(f'{"engine":<10}{engine_time:8.3f} s  x{engine_time / native_time:.1f}')
+  except ModuleNotFoundError as err:
+    print(f'{"engine":<10}not available ({err})')
+
+
+if __name__ == '__main__':
+  main()
@@ -38,6 +38,7 @@ class Building(CityObject):
     self._internal_zones = None
     self._thermal_zones_from_internal_zones = None
     self._aliases = []
+    self._fingerprint = None
     self._type = 'building'
     self._cold_water_temperature = {}
     self._heating_demand = {}
@@ -61,12 +62,6 @@ class Building(CityObject):
     self._attic_floors = []
     self._interior_slabs = []
     for surface_id, surface in enumerate(self.surfaces):
-      self._min_x = min(self._min_x, surface.lower_corner[0])
-      self._min_y = min(self._min_y, surface.lower_corner[1])
-      self._min_z = min(self._min_z, surface.lower_corner[2])
-      self._max_x = max(self._max_x, surface.upper_corner[0])
-      self._max_y = max(self._max_y, surface.upper_corner[1])
-      self._max_z = max(self._max_z, surface.upper_corner[2])
       surface.id = surface_id
       if surface.type == cte.GROUND:
         self._grounds.append(surface)
@@ -420,8 +415,8 @@ class Building(CityObject):
     """
     if self._eave_height is None:
       self._eave_height = 0
-      for wall in self.walls:
-        self._eave_height = max(self._eave_height, wall.upper_corner[2]) - self.simplified_polyhedron.min_z
+      if len(self.walls) > 0:
+        self._eave_height = max(wall.upper_corner[2] for wall in self.walls) - self.lower_corner[2]
     return self._eave_height
 
   @property
@@ -491,6 +486,22 @@ class Building(CityObject):
     if self.city is not None:
       self.city.add_building_alias(self, value)
 
+  @property
+  def fingerprint(self) -> Union[None, str]:
+    """
+    Get the fingerprint of the source feature the building was imported from
+    :return: None or str
+    """
+    return self._fingerprint
+
+  @fingerprint.setter
+  def fingerprint(self, value):
+    """
+    Set the fingerprint of the source feature the building was imported from
+    :param value: str
+    """
+    self._fingerprint = value
+
   @property
   def city(self) -> District:
     """
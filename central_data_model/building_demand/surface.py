@@ -114,6 +114,14 @@ class Surface:
       self._lower_corner = [self._min_coord('x'), self._min_coord('y'), self._min_coord('z')]
     return self._lower_corner
 
+  @lower_corner.setter
+  def lower_corner(self, value):
+    """
+    Set surface's lower corner [x, y, z]
+    :param value: [float]
+    """
+    self._lower_corner = value
+
   @property
   def upper_corner(self):
     """
@@ -124,6 +132,14 @@ class Surface:
       self._upper_corner = [self._max_coord('x'), self._max_coord('y'), self._max_coord('z')]
     return self._upper_corner
 
+  @upper_corner.setter
+  def upper_corner(self, value):
+    """
+    Set surface's upper corner [x, y, z]
+    :param value: [float]
+    """
+    self._upper_corner = value
+
   @property
   def perimeter_area(self):
     """
@@ -145,6 +161,14 @@ class Surface:
       self._azimuth = np.pi/2 - _azimuth  # for 0 = North
     return self._azimuth
 
+  @azimuth.setter
+  def azimuth(self, value):
+    """
+    Set surface azimuth in radians growing clockwise (North = 0, East = pi/2, South = -pi, West = -pi/2)
+    :param value: float
+    """
+    self._azimuth = value
+
   @property
   def zenith_angle(self):
     """
@@ -155,6 +179,14 @@ class Surface:
       self._zenith_angle = np.arccos(self.perimeter_polygon.normal[2])
     return self._zenith_angle
 
+  @zenith_angle.setter
+  def zenith_angle(self, value):
+    """
+    Set surface zenith angle in radians (zenith = 0, horizon = pi/2)
+    :param value: float
+    """
+    self._zenith_angle = value
+
   @property
   def type(self):
     """
@@ -10,8 +10,9 @@ from typing import List, Union
 
 from central_data_model.level_of_detail import LevelOfDetail
 from central_data_model.building_demand.surface import Surface
+from helpers.attributes.bounding_box import BoundingBox
 from helpers.attributes.polyhedron import Polyhedron
-from helpers.configuration_helper import ConfigurationHelper
+from helpers.attributes.prism import Prism
 
 
 class CityObject:
@@ -23,16 +24,10 @@ class CityObject:
     self._level_of_detail = LevelOfDetail()
     self._surfaces = surfaces
     self._type = None
-    self._city_object_lower_corner = None
-    self._city_object_upper_corner = None
+    self._bounding_box = None
     self._detailed_polyhedron = None
     self._simplified_polyhedron = None
-    self._min_x = ConfigurationHelper().max_coordinate
-    self._min_y = ConfigurationHelper().max_coordinate
-    self._min_z = ConfigurationHelper().max_coordinate
-    self._max_x = ConfigurationHelper().min_coordinate
-    self._max_y = ConfigurationHelper().min_coordinate
-    self._max_z = ConfigurationHelper().min_coordinate
+    self._prism = None
     self._centroid = None
     self._volume = None
     self._external_temperature = {}
@@ -42,6 +37,8 @@ class CityObject:
     self._beam = {}
     self._sensors = []
     self._neighbours = None
+    self._adjacency_district = None
+    self._adjacency_index = None
 
   @property
   def level_of_detail(self) -> LevelOfDetail:
@@ -74,7 +71,10 @@ class CityObject:
     :return: float
     """
     if self._volume is None:
-      self._volume = self.simplified_polyhedron.volume
+      if self.prism is not None:
+        self._volume = self.prism.volume
+      else:
+        self._volume = self.simplified_polyhedron.volume
     return self._volume
 
   @volume.setter
@@ -114,6 +114,24 @@ class CityObject:
       self._simplified_polyhedron = Polyhedron(polygons)
     return self._simplified_polyhedron
 
+  @property
+  def prism(self) -> Union[None, Prism]:
+    """
+    Get city object prism if the city object is an extruded footprint,
+    so its volume, centroid and height are known without building the polyhedron
+    :return: None or Prism
+    """
+    return self._prism
+
+  @prism.setter
+  def prism(self, value):
+    """
+    Set city object prism if the city object is an extruded footprint
+    :param value: Prism
+    """
+    self._prism = value
+    self._bounding_box = None
+
   @property
   def surfaces(self) -> List[Surface]:
     """
@@ -159,7 +177,10 @@ class CityObject:
     :return: [x,y,z]
     """
     if self._centroid is None:
-      self._centroid = self.simplified_polyhedron.centroid
+      if self.prism is not None:
+        self._centroid = self.prism.centroid
+      else:
+        self._centroid = self.simplified_polyhedron.centroid
     return self._centroid
 
   @property
@@ -168,7 +189,7 @@ class CityObject:
     Get city object maximal height in meters
     :return: float
     """
-    return self.simplified_polyhedron.max_z
+    return self.bounding_box.upper_corner[2]
 
   @property
   def external_temperature(self) -> {float}:
@@ -251,15 +272,26 @@ class CityObject:
     """
     self._beam = value
 
+  @property
+  def bounding_box(self) -> BoundingBox:
+    """
+    Get city object axis aligned bounding box, the prism one if the city object is an extruded footprint
+    :return: BoundingBox
+    """
+    if self._bounding_box is None:
+      if self.prism is not None:
+        self._bounding_box = BoundingBox(self.prism.lower_corner, self.prism.upper_corner)
+      else:
+        self._bounding_box = self.simplified_polyhedron.bounding_box
+    return self._bounding_box
+
   @property
   def lower_corner(self):
     """
     Get city object lower corner coordinates [x, y, z]
     :return: [x,y,z]
     """
-    if self._city_object_lower_corner is None:
-      self._city_object_lower_corner = [self._min_x, self._min_y, self._min_z]
-    return self._city_object_lower_corner
+    return self.bounding_box.lower_corner
 
   @property
   def upper_corner(self):
@@ -267,15 +299,18 @@ class CityObject:
     Get city object upper corner coordinates [x, y, z]
     :return: [x,y,z]
     """
-    if self._city_object_upper_corner is None:
-      self._city_object_upper_corner = [self._max_x, self._max_y, self._max_z]
-    return self._city_object_upper_corner
+    return self.bounding_box.upper_corner
 
   @property
   def neighbours(self) -> Union[None, List[CityObject]]:
     """
     Get the list of neighbour_objects and their properties associated to the current city_object
+    The neighbours read from the district adjacency graph are kept until the graph changes
     """
+    if self._neighbours is None and self._adjacency_district is not None:
+      # the district graph is calculated again if its buildings changed, giving the city object its new node index
+      adjacency_graph = self._adjacency_district.adjacency_graph
+      self._neighbours = adjacency_graph.neighbour_objects(self._adjacency_index)
     return self._neighbours
 
   @neighbours.setter
@@ -283,4 +318,26 @@ class CityObject:
     """
     Set the list of neighbour_objects and their properties associated to the current city_object
     """
+    self._adjacency_district = None
+    self._adjacency_index = None
     self._neighbours = value
+
+  @property
+  def adjacency_district(self):
+    """
+    Get the district whose adjacency graph the neighbours are read from, None if they are set directly
+    :return: None or District
+    """
+    return self._adjacency_district
+
+  def set_adjacency_district(self, district, index):
+    """
+    Read the neighbours from the given district adjacency graph instead of the neighbours list,
+    detached from any graph and without neighbours if the district is None
+    :param district: District
+    :param index: node index of the city object in the district graph, None until the graph is calculated again
+    :return: None
+    """
+    self._adjacency_district = district
+    self._adjacency_index = index
+    self._neighbours = None
@@ -11,14 +11,18 @@ from __future__ import annotations
 import logging
 from typing import List, Union
 
+import numpy as np
 import pyproj
 from pyproj import Transformer
 
 from central_data_model.weather_data import WeatherData
 from central_data_model.building import Building
 from central_data_model.open_area import OpenArea
+from helpers.adjacency_helper import AdjacencyHelper
+from helpers.configuration_helper import ConfigurationHelper
 from helpers.geometry_helper import GeometryHelper
 from helpers.location import Location
+from helpers.attributes.adjacency_graph import AdjacencyGraph
 from helpers.attributes.polygon import Polygon
 
 
@@ -40,6 +44,8 @@ class District:
     self._buildings = []
     self._open_areas = []
     self._reference_coordinates = None
+    self._adjacency_graph = None
+    self._adjacency_graph_changed = False
 
   def _get_location(self) -> Location:
     if self._location is None:
@@ -157,6 +163,17 @@ class District:
       return self.buildings[self._buildings_dictionary[name]]
     return None
 
+  def city_object(self, name) -> Union[Building, OpenArea, None]:
+    """
+    Retrieve the building or open area with the given name
+    :param name:str
+    :return: None, Building or OpenArea
+    """
+    city_object = self.building(name)
+    if city_object is None:
+      city_object = self.open_area(name)
+    return city_object
+
   def open_area(self, name) -> Union[OpenArea, None]:
     """
     Retrieve the open area with the given name
@@ -175,6 +192,14 @@ class District:
     """
     self._buildings.append(new_building)
     self._buildings_dictionary[new_building.name] = len(self._buildings) - 1
+    if self._adjacency_graph is not None:
+      # the new building walls are unknown, the graph is calculated again when a neighbours list is read
+      if not self._adjacency_graph_changed:
+        self._adjacency_graph_changed = True
+        for building in self._adjacency_graph.nodes:
+          if building.adjacency_district is self:
+            building.set_adjacency_district(self, None)
+      new_building.set_adjacency_district(self, None)
     return None
 
   def add_open_area(self, new_open_area):
@@ -197,6 +222,12 @@ class District:
     else:
       if building in self._buildings:
         self._buildings.remove(building)
+        if building.adjacency_district is self:
+          building.set_adjacency_district(None, None)
+        if self._adjacency_graph is not None and not self._adjacency_graph_changed:
+          nodes = self._adjacency_graph.nodes
+          kept = [index for index, node in enumerate(nodes) if node is not building]
+          self._replace_adjacency_graph(self._adjacency_graph.subgraph(kept))
         # regenerate hash map
         self._buildings_dictionary = {}
         for i, _building in enumerate(self._buildings):
@@ -234,6 +265,61 @@ class District:
     """
     self._polygon = value
 
+  @property
+  def lower_corner(self) -> List[float]:
+    """
+    Get the district buildings lower corner [x, y, z]
+    :return: [x, y, z]
+    """
+    if len(self._buildings) == 0:
+      return [ConfigurationHelper().max_coordinate] * 3
+    return np.min([building.lower_corner for building in self._buildings], axis=0).tolist()
+
+  @property
+  def upper_corner(self) -> List[float]:
+    """
+    Get the district buildings upper corner [x, y, z]
+    :return: [x, y, z]
+    """
+    if len(self._buildings) == 0:
+      return [ConfigurationHelper().min_coordinate] * 3
+    return np.max([building.upper_corner for building in self._buildings], axis=0).tolist()
+
+  @property
+  def adjacency_graph(self) -> AdjacencyGraph:
+    """
+    Get the graph of the buildings sharing walls, calculated the first time and after a building is added
+    :return: AdjacencyGraph
+    """
+    if self._adjacency_graph is None:
+      self.adjacency_graph = AdjacencyHelper.adjacency_graph(self._buildings)
+    elif self._adjacency_graph_changed:
+      self._replace_adjacency_graph(AdjacencyHelper.adjacency_graph(self._buildings))
+    return self._adjacency_graph
+
+  @adjacency_graph.setter
+  def adjacency_graph(self, value):
+    """
+    Set the graph of the buildings sharing walls, the buildings neighbours are read from it
+    :param value: AdjacencyGraph with the district buildings as nodes
+    """
+    self._adjacency_graph = value
+    self._adjacency_graph_changed = False
+    for index, building in enumerate(value.nodes):
+      building.set_adjacency_district(self, index)
+
+  def _replace_adjacency_graph(self, adjacency_graph):
+    """
+    Replace the graph of the buildings sharing walls, only the buildings reading their neighbours from the district
+    graph read them from the new one
+    :param adjacency_graph: AdjacencyGraph with the district buildings as nodes
+    """
+    self._adjacency_graph = adjacency_graph
+    self._adjacency_graph_changed = False
+    for index, building in enumerate(adjacency_graph.nodes):
+      if building.adjacency_district is self:
+        building.set_adjacency_district(self, index)
+
   @property
   def area(self):
     """
@@ -0,0 +1,175 @@
+"""
+Adjacency helper
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import shapely
+
+from helpers.attributes.adjacency_graph import AdjacencyGraph
+
+
+def _shared_segments_in_worker(arguments):
+  return AdjacencyHelper.shared_segments(*arguments)
+
+
+class AdjacencyHelper:
+  """
+  AdjacencyHelper class
+  Finds the footprint segments shared by different buildings, the segments are indexed in a tree
+  so only the close ones are compared
+  """
+  # maximal distance in meters between two segments to be considered the same wall
+  TOLERANCE = 0.1
+  # side in meters of the square tiles processed by each parallel task
+  TILE_SIZE = 500.0
+
+  @staticmethod
+  def footprint_segments(building):
+    """
+    Get the segments of the building footprint, the perimeter of its lowest grounds
+    :param building: Building
+    :return: np.ndarray [[x, y]] starts, np.ndarray [[x, y]] ends
+    """
+    starts = []
+    ends = []
+    for ground in building.grounds:
+      if ground.lower_corner[2] > building.lower_corner[2]:
+        # upper storeys floors repeat the footprint
+        continue
+      ring = np.asarray(ground.perimeter_polygon.coordinates, dtype=float)[:, :2]
+      starts.append(ring)
+      ends.append(np.concatenate((ring[1:], ring[:1])))
+    if len(starts) == 0:
+      return np.empty((0, 2)), np.empty((0, 2))
+    return np.concatenate(starts), np.concatenate(ends)
+
+  @staticmethod
+  def footprints(buildings):
+    """
+    Get the footprint segments of the given buildings
+    :param buildings: [Building]
+    :return: np.ndarray [[x, y]] starts, np.ndarray [[x, y]] ends, np.ndarray building index of each segment
+    """
+    starts = [np.empty((0, 2))]
+    ends = [np.empty((0, 2))]
+    owners = [np.empty(0, dtype=np.int64)]
+    for index, building in enumerate(buildings):
+      building_starts, building_ends = AdjacencyHelper.footprint_segments(building)
+      starts.append(building_starts)
+      ends.append(building_ends)
+      owners.append(np.full(len(building_starts), index, dtype=np.int64))
+    return np.concatenate(starts), np.concatenate(ends), np.concatenate(owners)
+
+  @staticmethod
+  def adjacency_graph(buildings, tolerance=TOLERANCE, workers=None) -> AdjacencyGraph:
+    """
+    Get the adjacency graph of the buildings sharing footprint segments
+    :param buildings: [Building]
+    :param tolerance: maximal distance in meters between the segments
+    :param workers: number of processes sharing the district tiles, sequential if None or 1
+    :return: AdjacencyGraph
+    """
+    starts, ends, owners = AdjacencyHelper.footprints(buildings)
+    first, second, shared_lengths, shared_starts, shared_ends = AdjacencyHelper.shared_segments(
+      starts, ends, owners, tolerance, workers
+    )
+    return AdjacencyGraph.from_pairs(buildings, owners[first], owners[second], shared_lengths, shared_starts,
+                                     shared_ends)
+
+  @staticmethod
+  def shared_segments(starts, ends, owners, tolerance=TOLERANCE, workers=None):
+    """
+    Get the pairs of collinear and overlapping segments belonging to different owners
+    :param starts: [[x, y]] segments start
+    :param ends: [[x, y]] segments end
+    :param owners: [int] owner of each segment
+    :param tolerance: maximal distance in meters between the segments
+    :param workers: number of processes sharing the district tiles, sequential if None or 1
+    :return: np.ndarray first segments, np.ndarray second segments, np.ndarray shared lengths in meters,
+    np.ndarray [[x, y]] shared part starts, np.ndarray [[x, y]] shared part ends
+    """
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    owners = np.asarray(owners)
+    if len(starts) == 0:
+      return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0), np.empty((0, 2)), np.empty((0, 2))
+    if workers is not None and workers > 1:
+      tiles = AdjacencyHelper.tiles(starts, ends, tolerance)
+      if len(tiles) > 1:
+        return AdjacencyHelper._parallel_shared_segments(starts, ends, owners, tolerance, workers, tiles)
+    tree = shapely.STRtree(shapely.linestrings(np.stack((starts, ends), axis=1)))
+    first, second = tree.query(tree.geometries, predicate='dwithin', distance=tolerance)
+    candidates = (first < second) & (owners[first] != owners[second])
+    order = np.lexsort((second[candidates], first[candidates]))
+    first = first[candidates][order]
+    second = second[candidates][order]
+    # the longest segment of each pair is the reference line
+    lengths = np.hypot(*(ends - starts).T)
+    swap = lengths[second] > lengths[first]
+    reference = np.where(swap, second, first)
+    other = np.where(swap, first, second)
+    reference_length = lengths[reference]
+    valid = reference_length > tolerance
+    direction = (ends[reference] - starts[reference]) / np.where(valid, reference_length, 1)[:, np.newaxis]
+    other_start = starts[other] - starts[reference]
+    other_end = ends[other] - starts[reference]
+    # distance from the other segment ends to the reference line and position along it
+    distance_start = direction[:, 0] * other_start[:, 1] - direction[:, 1] * other_start[:, 0]
+    distance_end = direction[:, 0] * other_end[:, 1] - direction[:, 1] * other_end[:, 0]
+    position_start = (direction * other_start).sum(axis=1)
+    position_end = (direction * other_end).sum(axis=1)
+    shared_start = np.maximum(np.minimum(position_start, position_end), 0)
+    shared_end = np.minimum(np.maximum(position_start, position_end), reference_length)
+    shared = (valid & (np.abs(distance_start) <= tolerance) & (np.abs(distance_end) <= tolerance)
+              & (shared_end - shared_start > tolerance))
+    origin = starts[reference[shared]]
+    direction = direction[shared]
+    return (first[shared], second[shared], (shared_end - shared_start)[shared],
+            origin + direction * shared_start[shared, np.newaxis], origin + direction * shared_end[shared, np.newaxis])
+
+  @staticmethod
+  def tiles(starts, ends, halo=TOLERANCE):
+    """
+    Get the segments in each square tile of the district, a segment is in every tile closer than the halo so the
+    segments closer than the halo share at least one tile
+    :param starts: [[x, y]] segments start
+    :param ends: [[x, y]] segments end
+    :param halo: distance in meters around the tiles
+    :return: [np.ndarray] segments of each tile
+    """
+    lower = np.minimum(starts, ends) - halo
+    upper = np.maximum(starts, ends) + halo
+    origin = lower.min(axis=0)
+    first_cell = ((lower - origin) // AdjacencyHelper.TILE_SIZE).astype(np.int64)
+    last_cell = ((upper - origin) // AdjacencyHelper.TILE_SIZE).astype(np.int64)
+    segments = [np.arange(len(starts))]
+    cells = [first_cell]
+    # the few segments crossing the tile edges are repeated in the next tiles
+    for segment in np.nonzero((first_cell != last_cell).any(axis=1))[0].tolist():
+      for x in range(first_cell[segment, 0], last_cell[segment, 0] + 1):
+        for y in range(first_cell[segment, 1], last_cell[segment, 1] + 1):
+          if x != first_cell[segment, 0] or y != first_cell[segment, 1]:
+            segments.append(np.array([segment]))
+            cells.append(np.array([[x, y]]))
+    segments = np.concatenate(segments)
+    _, tile, counts = np.unique(np.concatenate(cells), axis=0, return_inverse=True, return_counts=True)
+    order = np.argsort(tile.reshape(-1), kind='stable')
+    # sorted, so the pairs keep their order in the tiles
+    return [np.sort(tile) for tile in np.split(segments[order], np.cumsum(counts)[:-1])]
+
+  @staticmethod
+  def _parallel_shared_segments(starts, ends, owners, tolerance, workers, tiles):
+    tasks = [(starts[tile], ends[tile], owners[tile], tolerance) for tile in tiles]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+      results = list(executor.map(_shared_segments_in_worker, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    # back to the district segment indexes, the pairs in the halo are found by several tiles
+    first = np.concatenate([tile[result[0]] for tile, result in zip(tiles, results)])
+    second = np.concatenate([tile[result[1]] for tile, result in zip(tiles, results)])
+    pairs, unique = np.unique(first * len(starts) + second, return_index=True)
+    return (pairs // len(starts), pairs % len(starts), np.concatenate([result[2] for result in results])[unique],
+            np.concatenate([result[3] for result in results])[unique],
+            np.concatenate([result[4] for result in results])[unique])
@@ -0,0 +1,180 @@
+"""
+Adjacency graph module
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+
+from typing import List, Tuple, Union
+
+import numpy as np
+
+
+class AdjacencyGraph:
+  """
+  AdjacencyGraph class
+  Neighbourhood of the city objects stored as compressed sparse rows, the neighbours of the node i are
+  indices[indptr[i]:indptr[i + 1]] and each edge knows its shared length and the shared segments
+  """
+
+  def __init__(self, nodes, indptr, indices, shared_lengths, segment_indptr, segment_starts, segment_ends):
+    # own copy, the graph indices must not follow the changes of the nodes list it was built from
+    self._nodes = list(nodes)
+    self._indptr = indptr
+    self._indices = indices
+    self._shared_lengths = shared_lengths
+    self._segment_indptr = segment_indptr
+    self._segment_starts = segment_starts
+    self._segment_ends = segment_ends
+    self._connected_blocks = None
+
+  @staticmethod
+  def from_pairs(nodes, first, second, shared_lengths, shared_starts, shared_ends) -> 'AdjacencyGraph':
+    """
+    Get the adjacency graph of the given shared segments, a pair of nodes may share several segments
+    :param nodes: [CityObject]
+    :param first: [int] first node of each shared segment
+    :param second: [int] second node of each shared segment
+    :param shared_lengths: [float] shared segments length in meters
+    :param shared_starts: [[x, y]] shared segments start
+    :param shared_ends: [[x, y]] shared segments end
+    :return: AdjacencyGraph
+    """
+    size = len(nodes)
+    first = np.asarray(first, dtype=np.int64)
+    second = np.asarray(second, dtype=np.int64)
+    # both directions, so every node lists all its neighbours
+    rows = np.concatenate((first, second))
+    columns = np.concatenate((second, first))
+    lengths = np.tile(np.asarray(shared_lengths, dtype=float), 2)
+    starts = np.tile(np.asarray(shared_starts, dtype=float).reshape(-1, 2), (2, 1))
+    ends = np.tile(np.asarray(shared_ends, dtype=float).reshape(-1, 2), (2, 1))
+    order = np.lexsort((columns, rows))
+    edges, segment_indptr, segment_edges = np.unique(rows[order] * size + columns[order],
+                                                     return_index=True, return_inverse=True)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges // size, minlength=size), out=indptr[1:])
+    return AdjacencyGraph(nodes, indptr, edges % size,
+                          np.bincount(segment_edges, weights=lengths[order], minlength=len(edges)),
+                          np.append(segment_indptr, len(order)), starts[order], ends[order])
+
+  @property
+  def nodes(self) -> List:
+    """
+    Get the graph nodes, the city objects in the order of their indices
+    :return: [CityObject]
+    """
+    return self._nodes
+
+  @property
+  def indptr(self) -> np.ndarray:
+    """
+    Get the position of the first edge of each node, and the number of edges at the end
+    :return: np.ndarray(int)
+    """
+    return self._indptr
+
+  @property
+  def indices(self) -> np.ndarray:
+    """
+    Get the neighbour node of each edge
+    :return: np.ndarray(int)
+    """
+    return self._indices
+
+  @property
+  def shared_lengths(self) -> np.ndarray:
+    """
+    Get the footprint length shared along each edge in meters
+    :return: np.ndarray(float)
+    """
+    return self._shared_lengths
+
+  @property
+  def degree(self) -> np.ndarray:
+    """
+    Get the number of neighbours of each node
+    :return: np.ndarray(int)
+    """
+    return np.diff(self._indptr)
+
+  def neighbours(self, index) -> np.ndarray:
+    """
+    Get the neighbour node indices of the given node
+    :param index: int
+    :return: np.ndarray(int)
+    """
+    return self._indices[self._indptr[index]:self._indptr[index + 1]]
+
+  def neighbour_lengths(self, index) -> np.ndarray:
+    """
+    Get the footprint length the given node shares with each neighbour in meters
+    :param index: int
+    :return: np.ndarray(float)
+    """
+    return self._shared_lengths[self._indptr[index]:self._indptr[index + 1]]
+
+  def neighbour_objects(self, index) -> Union[None, List]:
+    """
+    Get the neighbour city objects of the given node, None if it has no neighbours
+    :param index: int
+    :return: None or [CityObject]
+    """
+    if self._indptr[index] == self._indptr[index + 1]:
+      return None
+    return [self._nodes[neighbour] for neighbour in self.neighbours(index).tolist()]
+
+  def shared_segments(self, index, neighbour) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the footprint segments shared by the given nodes
+    :param index: int
+    :param neighbour: int
+    :return: np.ndarray [[x, y]] starts, np.ndarray [[x, y]] ends
+    """
+    edge = self._indptr[index] + np.searchsorted(self.neighbours(index), neighbour)
+    if edge == self._indptr[index + 1] or self._indices[edge] != neighbour:
+      return np.empty((0, 2)), np.empty((0, 2))
+    segments = slice(self._segment_indptr[edge], self._segment_indptr[edge + 1])
+    return self._segment_starts[segments], self._segment_ends[segments]
+
+  def subgraph(self, kept) -> 'AdjacencyGraph':
+    """
+    Get the graph of the given nodes with the edges among them, the nodes keep their order
+    :param kept: [int] increasing indices of the kept nodes
+    :return: AdjacencyGraph
+    """
+    kept = np.asarray(kept, dtype=np.int64)
+    new_indices = np.full(len(self._nodes), -1, dtype=np.int64)
+    new_indices[kept] = np.arange(len(kept))
+    rows = new_indices[np.repeat(np.arange(len(self._nodes)), self.degree)]
+    columns = new_indices[self._indices]
+    edges = (rows >= 0) & (columns >= 0)
+    indptr = np.zeros(len(kept) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[edges], minlength=len(kept)), out=indptr[1:])
+    segments = np.diff(self._segment_indptr)
+    segment_indptr = np.zeros(np.count_nonzero(edges) + 1, dtype=np.int64)
+    np.cumsum(segments[edges], out=segment_indptr[1:])
+    kept_segments = np.repeat(edges, segments)
+    return AdjacencyGraph([self._nodes[index] for index in kept.tolist()], indptr, columns[edges],
+                          self._shared_lengths[edges], segment_indptr, self._segment_starts[kept_segments],
+                          self._segment_ends[kept_segments])
+
+  @property
+  def connected_blocks(self) -> np.ndarray:
+    """
+    Get the block of each node, the nodes connected by shared walls are in the same block numbered from 0
+    :return: np.ndarray(int)
+    """
+    if self._connected_blocks is None:
+      labels = np.arange(len(self._nodes))
+      rows = np.repeat(labels, self.degree)
+      while True:
+        # each node takes the lowest label around it and then the label of that label
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, rows, labels[self._indices])
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+          break
+        labels = new_labels
+      self._connected_blocks = np.unique(labels, return_inverse=True)[1].reshape(-1)
+    return self._connected_blocks
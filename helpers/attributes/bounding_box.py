@@ -0,0 +1,47 @@
+"""
+Bounding box module
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+
+from typing import List
+
+import numpy as np
+
+
+class BoundingBox:
+  """
+  BoundingBox class
+  Axis aligned box containing a set of coordinates
+  """
+
+  def __init__(self, lower_corner, upper_corner):
+    self._lower_corner = lower_corner
+    self._upper_corner = upper_corner
+
+  @staticmethod
+  def from_coordinates(coordinates) -> 'BoundingBox':
+    """
+    Get the bounding box of the given coordinates, reduced at once
+    :param coordinates: [[x, y, z]]
+    :return: BoundingBox
+    """
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    return BoundingBox(coordinates.min(axis=0).tolist(), coordinates.max(axis=0).tolist())
+
+  @property
+  def lower_corner(self) -> List[float]:
+    """
+    Get bounding box lower corner [x, y, z]
+    :return: [float]
+    """
+    return self._lower_corner
+
+  @property
+  def upper_corner(self) -> List[float]:
+    """
+    Get bounding box upper corner [x, y, z]
+    :return: [float]
+    """
+    return self._upper_corner
@@ -9,7 +9,6 @@ from __future__ import annotations
 
 import logging
 import math
-import sys
 from typing import List
 
 import numpy as np
@@ -21,6 +20,8 @@ from trimesh import Trimesh
 
 from helpers.attributes.plane import Plane
 from helpers.attributes.point import Point
+from helpers.triangulation_helper import TriangulationHelper
+from helpers.utils import weld_vertices, triangular_faces
 import helpers.constants as cte
 
 
@@ -28,8 +29,13 @@ class Polygon:
   """
   Polygon class
   """
+  # maximal distance in meters from a vertex to the polygon plane for the polygon to be planar
+  _PLANARITY_TOLERANCE = 1e-3
+
   def __init__(self, coordinates):
     self._area = None
+    self._newell_vector = None
+    self._is_planar = None
     self._points = None
     self._points_list = None
     self._normal = None
@@ -37,7 +43,9 @@ class Polygon:
     self._edges = None
     self._coordinates = coordinates
     self._triangles = None
+    self._triangle_faces = None
     self._vertices = None
+    self._vertex_indexes = None
     self._faces = None
     self._plane = None
     self._center_of_gravity = None
@@ -103,84 +111,80 @@ class Polygon:
   def area(self):
     """
     Get surface area in square meters
+    The area of a planar polygon is half the norm of its Newell vector, only the non-planar ones are triangulated
     :return: float
     """
     if self._area is None:
-      self._area = 0
-      for triangle in self.triangles:
-        a_b = np.zeros(3)
-        a_c = np.zeros(3)
-        for i in range(0, 3):
-          a_b[i] = triangle.coordinates[1][i] - triangle.coordinates[0][i]
-          a_c[i] = triangle.coordinates[2][i] - triangle.coordinates[0][i]
-        self._area += np.linalg.norm(np.cross(a_b, a_c)) / 2
+      if self.is_planar:
+        self._area = math.sqrt(np.dot(self.newell_vector, self.newell_vector)) / 2
+      else:
+        self._area = self._triangulated_area()
     return self._area
 
   @area.setter
   def area(self, value):
     self._area = value
 
+  def _triangulated_area(self):
+    """
+    Get the surface area in square meters as the sum of its triangles area
+    :return: float
+    """
+    area = 0
+    for triangle in self.triangles:
+      coordinates = np.asarray(triangle.coordinates, dtype=float)
+      area += np.linalg.norm(np.cross(coordinates[1] - coordinates[0], coordinates[2] - coordinates[0])) / 2
+    return float(area)
+
+  @property
+  def newell_vector(self) -> np.ndarray:
+    """
+    Get the polygon Newell vector, normal to the polygon plane with a norm of twice its area
+    :return: np.ndarray
+    """
+    if self._newell_vector is None:
+      # sum of the cross products of each vertex and the next one, the vector does not depend on the origin
+      # and taking the first vertex as origin reduces the rounding errors and the terms with the first vertex vanish
+      coordinates = np.asarray(self.coordinates, dtype=float)
+      coordinates = coordinates - coordinates[0]
+      x = coordinates[:, 0]
+      y = coordinates[:, 1]
+      z = coordinates[:, 2]
+      self._newell_vector = np.array([np.dot(y[:-1], z[1:]) - np.dot(z[:-1], y[1:]),
+                                      np.dot(z[:-1], x[1:]) - np.dot(x[:-1], z[1:]),
+                                      np.dot(x[:-1], y[1:]) - np.dot(y[:-1], x[1:])])
+    return self._newell_vector
+
+  @property
+  def is_planar(self) -> bool:
+    """
+    Get if all the polygon vertices are in the plane given by its normal within the planarity tolerance
+    :return: Boolean
+    """
+    if self._is_planar is None:
+      coordinates = np.asarray(self.coordinates, dtype=float)
+      distances = np.dot(coordinates - coordinates.mean(axis=0), self.normal)
+      self._is_planar = bool(np.abs(distances).max() <= self._PLANARITY_TOLERANCE)
+    return self._is_planar
+
   @property
   def normal(self) -> np.ndarray:
     """
-    Get surface normal vector
+    Get surface normal vector, following the right hand rule over the polygon vertices (Newell's method)
     :return: np.ndarray
     """
     if self._normal is None:
-      points = self.coordinates
-      # todo: IF THE FIRST ONE IS 0, START WITH THE NEXT
-      point_origin = points[len(points) - 2]
-      vector_1 = points[len(points) - 1] - point_origin
-      vector_2 = points[0] - point_origin
-      vector_3 = points[1] - point_origin
-      cross_product = np.cross(vector_1, vector_2)
-      if np.linalg.norm(cross_product) != 0:
-        cross_product = cross_product / np.linalg.norm(cross_product)
-        alpha = self._angle_between_vectors(vector_1, vector_2)
-      else:
-        cross_product = [0, 0, 0]
-        alpha = 0
-      if len(points) == 3:
-        return cross_product
-      if np.linalg.norm(cross_product) == 0:
-        return cross_product
-      alpha += self._angle(vector_2, vector_3, cross_product)
-      for i in range(0, len(points) - 4):
-        vector_1 = points[i + 1] - point_origin
-        vector_2 = points[i + 2] - point_origin
-        alpha += self._angle(vector_1, vector_2, cross_product)
-      vector_1 = points[len(points) - 1] - point_origin
-      vector_2 = points[0] - point_origin
-      if alpha < 0:
-        cross_product = np.cross(vector_2, vector_1)
+      newell_vector = self.newell_vector
+      norm = math.sqrt(np.dot(newell_vector, newell_vector))
+      if norm == 0:
+        self._normal = np.zeros(3)
       else:
-        cross_product = np.cross(vector_1, vector_2)
-      self._normal = cross_product / np.linalg.norm(cross_product)
+        self._normal = newell_vector / norm
     return self._normal
 
-  @staticmethod
-  def _angle(vector_1, vector_2, cross_product):
-    """
-    alpha angle in radians
-    :param vector_1: [float]
-    :param vector_2: [float]
-    :param cross_product: [float]
-    :return: float
-    """
-    accepted_normal_difference = 0.01
-    cross_product_next = np.cross(vector_1, vector_2)
-    if np.linalg.norm(cross_product_next) != 0:
-      cross_product_next = cross_product_next / np.linalg.norm(cross_product_next)
-      alpha = Polygon._angle_between_vectors(vector_1, vector_2)
-    else:
-      cross_product_next = [0, 0, 0]
-      alpha = 0
-    delta_normals = 0
-    for j in range(0, 3):
-      delta_normals += cross_product[j] - cross_product_next[j]
-    if np.abs(delta_normals) < accepted_normal_difference:
-      return alpha
-    return -alpha
+  @normal.setter
+  def normal(self, value):
+    self._normal = value
 
   @staticmethod
   def triangle_mesh(vertices, normal) -> Trimesh:
@@ -188,58 +192,48 @@ class Polygon:
     Get the triangulated mesh of the polygon
     :return: Trimesh
     """
-    min_x = 1e16
-    min_y = 1e16
-    min_z = 1e16
-    for vertex in vertices:
-      if vertex[0] < min_x:
-        min_x = vertex[0]
-      if vertex[1] < min_y:
-        min_y = vertex[1]
-      if vertex[2] < min_z:
-        min_z = vertex[2]
-
-    new_vertices = []
-    for vertex in vertices:
-      vertex = [vertex[0]-min_x, vertex[1]-min_y, vertex[2]-min_z]
-      new_vertices.append(vertex)
-
-    transformation_matrix = trimesh.geometry.plane_transform(origin=new_vertices[0], normal=normal)
-
-    coordinates = []
-    for vertex in vertices:
-      transformed_vertex = [vertex[0]-min_x, vertex[1]-min_y, vertex[2]-min_z, 1]
-      transformed_vertex = np.dot(transformation_matrix, transformed_vertex)
-      coordinate = [transformed_vertex[0], transformed_vertex[1]]
-      coordinates.append(coordinate)
-
-    polygon = shapley_polygon(coordinates)
+    return Trimesh(vertices=vertices, faces=Polygon._triangulate(vertices, normal))
+
+  @staticmethod
+  def _triangulate(vertices, normal) -> np.ndarray:
+    """
+    Get the triangular faces of the polygon oriented as the normal, the simple polygons are triangulated natively
+    and only the polygons with holes or degenerated are triangulated by the external engine
+    :return: np.ndarray
+    """
+    return TriangulationHelper.triangulate(vertices, normal, Polygon._engine_faces)
 
+  @staticmethod
+  def _engine_faces(vertices, normal) -> np.ndarray:
+    """
+    Get the triangular faces of the polygon oriented as the normal triangulated by the external engine
+    :return: np.ndarray
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    vertices = vertices - vertices.min(axis=0)
+    transformation_matrix = trimesh.geometry.plane_transform(origin=vertices[0], normal=normal)
+    coordinates = np.column_stack((vertices, np.ones(len(vertices)))) @ transformation_matrix.T
+    polygon = shapley_polygon(coordinates[:, :2])
     try:
       _, faces = trimesh.creation.triangulate_polygon(polygon, engine='triangle')
-
-      mesh = Trimesh(vertices=vertices, faces=faces)
-
-      # check orientation
-      normal_sum = 0
-      for i in range(0, 3):
-        normal_sum += normal[i] + mesh.face_normals[0][i]
-
-      if abs(normal_sum) <= 1E-10:
-        new_faces = []
-        for face in faces:
-          new_face = []
-          for i in range(0, len(face)):
-            new_face.append(face[len(face)-i-1])
-          new_faces.append(new_face)
-        mesh = Trimesh(vertices=vertices, faces=new_faces)
-      return mesh
-
     except ValueError:
       logging.error('Not able to triangulate polygon\n')
-      _vertices = [[0, 0, 0], [0, 0, 1], [0, 1, 0]]
-      _faces = [[0, 1, 2]]
-      return Trimesh(vertices=_vertices, faces=_faces)
+      return np.array([[0, 1, 2]])
+    # check orientation
+    face = vertices[faces[0]]
+    if np.dot(np.cross(face[1] - face[0], face[2] - face[0]), normal) < 0:
+      faces = faces[:, ::-1]
+    return faces
+
+  @property
+  def triangle_faces(self) -> np.ndarray:
+    """
+    Get the polygon triangles as indexes of its coordinates
+    :return: np.ndarray
+    """
+    if self._triangle_faces is None:
+      self._triangle_faces = self._triangulate(self.coordinates, self.normal)
+    return self._triangle_faces
 
   @property
   def triangles(self) -> List[Polygon]:
@@ -248,35 +242,10 @@ class Polygon:
     :return: [Polygon]
     """
     if self._triangles is None:
-      self._triangles = []
-      _mesh = self.triangle_mesh(self.coordinates, self.normal)
-      for face in _mesh.faces:
-        points = []
-        for vertex in face:
-          points.append(self.coordinates[vertex])
-        polygon = Polygon(points)
-        self._triangles.append(polygon)
+      coordinates = np.asarray(self.coordinates)
+      self._triangles = [Polygon(triangle) for triangle in coordinates[self.triangle_faces]]
     return self._triangles
 
-  @staticmethod
-  def _angle_between_vectors(vec_1, vec_2):
-    """
-    angle between vectors in radians
-    :param vec_1: vector
-    :param vec_2: vector
-    :return: float
-    """
-    if np.linalg.norm(vec_1) == 0 or np.linalg.norm(vec_2) == 0:
-      sys.stderr.write("Warning: impossible to calculate angle between planes' normal. Return 0\n")
-      return 0
-    cosine = np.dot(vec_1, vec_2) / np.linalg.norm(vec_1) / np.linalg.norm(vec_2)
-    if cosine > 1 and cosine - 1 < 1e-5:
-      cosine = 1
-    elif cosine < -1 and cosine + 1 > -1e-5:
-      cosine = -1
-    alpha = math.acos(cosine)
-    return alpha
-
   @property
   def inverse(self):
     """
@@ -361,22 +330,8 @@ class Polygon:
     :return: np.ndarray(int)
     """
     if self._vertices is None:
-      vertices, self._vertices = [], []
-      _ = [vertices.extend(s.coordinates) for s in self.triangles]
-      for vertex_1 in vertices:
-        found = False
-        for vertex_2 in self._vertices:
-          found = False
-          power = 0
-          for dimension in range(0, 3):
-            power += math.pow(vertex_2[dimension] - vertex_1[dimension], 2)
-          distance = math.sqrt(power)
-          if distance == 0:
-            found = True
-            break
-        if not found:
-          self._vertices.append(vertex_1)
-      self._vertices = np.asarray(self._vertices)
+      coordinates = np.asarray(self.coordinates)[self.triangle_faces]
+      self._vertices, self._vertex_indexes = weld_vertices(coordinates)
     return self._vertices
 
   @property
@@ -386,45 +341,10 @@ class Polygon:
     :return: [face]
     """
     if self._faces is None:
-      self._faces = []
-
-      for polygon in self.triangles:
-        face = []
-        points = polygon.coordinates
-        if len(points) != 3:
-          sub_polygons = polygon.triangles
-          # todo: I modified this! To be checked @Guille
-          if len(sub_polygons) < 1:
-            continue
-          for sub_polygon in sub_polygons:
-            face = []
-            points = sub_polygon.coordinates
-            for point in points:
-              face.append(self._position_of(point, face))
-            self._faces.append(face)
-        else:
-          for point in points:
-            face.append(self._position_of(point, face))
-          self._faces.append(face)
+      _ = self.vertices
+      self._faces = triangular_faces(self._vertex_indexes)
     return self._faces
 
-  def _position_of(self, point, face):
-    """
-    position of a specific point in the list of points that define a face
-    :return: int
-    """
-    vertices = self.vertices
-    for i in enumerate(vertices):
-      # ensure not duplicated vertex
-      power = 0
-      vertex2 = vertices[i]
-      for dimension in range(0, 3):
-        power += math.pow(vertex2[dimension] - point[dimension], 2)
-      distance = math.sqrt(power)
-      if i not in face and distance == 0:
-        return i
-    return -1
-
   @staticmethod
   def _triangle_centroid(triangle):
     x = 0
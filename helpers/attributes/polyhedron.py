@@ -8,10 +8,11 @@ Code contributors: Pilar Monsalvete Alvarez de Uribarri pilar.monsalvete@concord
 
 from typing import List, Union
 import sys
-import math
 import numpy as np
 from trimesh import Trimesh
+from helpers.attributes.bounding_box import BoundingBox
 from helpers.configuration_helper import ConfigurationHelper
+from helpers.utils import weld_vertices, triangular_faces
 
 
 class Polyhedron:
@@ -26,31 +27,10 @@ class Polyhedron:
     self._volume = None
     self._faces = None
     self._vertices = None
+    self._vertex_indexes = None
     self._trimesh = None
     self._centroid = None
-    self._max_z = None
-    self._max_y = None
-    self._max_x = None
-    self._min_z = None
-    self._min_y = None
-    self._min_x = None
-
-  def _position_of(self, point, face):
-    """
-    position of a specific point in the list of points that define a face
-    :return: int
-    """
-    vertices = self.vertices
-    for i, vertex in enumerate(vertices):
-      # ensure not duplicated vertex
-      power = 0
-      vertex2 = vertex
-      for dimension in range(0, 3):
-        power += math.pow(vertex2[dimension] - point[dimension], 2)
-      distance = math.sqrt(power)
-      if i not in face and distance == 0:
-        return i
-    return -1
+    self._bounding_box = None
 
   @property
   def vertices(self) -> np.ndarray:
@@ -59,22 +39,10 @@ class Polyhedron:
     :return: np.ndarray(int)
     """
     if self._vertices is None:
-      vertices, self._vertices = [], []
-      _ = [vertices.extend(s.coordinates) for s in self._polygons]
-      for vertex_1 in vertices:
-        found = False
-        for vertex_2 in self._vertices:
-          found = False
-          power = 0
-          for dimension in range(0, 3):
-            power += math.pow(vertex_2[dimension] - vertex_1[dimension], 2)
-          distance = math.sqrt(power)
-          if distance == 0:
-            found = True
-            break
-        if not found:
-          self._vertices.append(vertex_1)
-      self._vertices = np.asarray(self._vertices)
+      coordinates = [polygon.coordinates for polygon in self._polygons]
+      if len(coordinates) == 0:
+        coordinates = np.empty((0, 3))
+      self._vertices, self._vertex_indexes = weld_vertices(np.concatenate(coordinates))
     return self._vertices
 
   @property
@@ -84,26 +52,18 @@ class Polyhedron:
     :return: [face]
     """
     if self._faces is None:
-      self._faces = []
-
+      _ = self.vertices
+      indexes = []
+      start = 0
       for polygon in self._polygons:
-
-        face = []
-        points = polygon.coordinates
-        if len(points) != 3:
-          sub_polygons = polygon.triangles
-          if len(sub_polygons) < 1:
-            continue
-          for sub_polygon in sub_polygons:
-            face = []
-            points = sub_polygon.coordinates
-            for point in points:
-              face.append(self._position_of(point, face))
-            self._faces.append(face)
-        else:
-          for point in points:
-            face.append(self._position_of(point, face))
-          self._faces.append(face)
+        polygon_indexes = self._vertex_indexes[start:start + len(polygon.coordinates)]
+        start += len(polygon.coordinates)
+        if len(polygon_indexes) != 3:
+          polygon_indexes = polygon_indexes[polygon.triangle_faces]
+        indexes.append(polygon_indexes.reshape(-1))
+      if len(indexes) == 0:
+        indexes = [np.empty(0, dtype=int)]
+      self._faces = triangular_faces(np.concatenate(indexes))
     return self._faces
 
   @property
@@ -135,18 +95,29 @@ class Polyhedron:
         self._volume = self.trimesh.volume
     return self._volume
 
+  @property
+  def bounding_box(self) -> BoundingBox:
+    """
+    Get polyhedron axis aligned bounding box
+    :return: BoundingBox
+    """
+    if self._bounding_box is None:
+      if len(self._polygons) == 0:
+        min_coordinate = ConfigurationHelper().min_coordinate
+        self._bounding_box = BoundingBox([min_coordinate] * 3, [min_coordinate] * 3)
+      else:
+        self._bounding_box = BoundingBox.from_coordinates(
+          np.concatenate([np.asarray(polygon.coordinates, dtype=float).reshape(-1, 3) for polygon in self._polygons])
+        )
+    return self._bounding_box
+
   @property
   def max_z(self):
     """
     Get polyhedron maximal z value in meters
     :return: float
     """
-    if self._max_z is None:
-      self._max_z = ConfigurationHelper().min_coordinate
-      for polygon in self._polygons:
-        for point in polygon.coordinates:
-          self._max_z = max(self._max_z, point[2])
-    return self._max_z
+    return self.bounding_box.upper_corner[2]
 
   @property
   def max_y(self):
@@ -154,13 +125,7 @@ class Polyhedron:
     Get polyhedron maximal y value in meters
     :return: float
     """
-    if self._max_y is None:
-      self._max_y = ConfigurationHelper().min_coordinate
-      for polygon in self._polygons:
-        for point in polygon.coordinates:
-          if self._max_y < point[1]:
-            self._max_y = point[1]
-    return self._max_y
+    return self.bounding_box.upper_corner[1]
 
   @property
   def max_x(self):
@@ -168,12 +133,7 @@ class Polyhedron:
     Get polyhedron maximal x value in meters
     :return: float
     """
-    if self._max_x is None:
-      self._max_x = ConfigurationHelper().min_coordinate
-      for polygon in self._polygons:
-        for point in polygon.coordinates:
-          self._max_x = max(self._max_x, point[0])
-    return self._max_x
+    return self.bounding_box.upper_corner[0]
 
   @property
   def min_z(self):
@@ -181,13 +141,7 @@ class Polyhedron:
     Get polyhedron minimal z value in meters
     :return: float
     """
-    if self._min_z is None:
-      self._min_z = self.max_z
-      for polygon in self._polygons:
-        for point in polygon.coordinates:
-          if self._min_z > point[2]:
-            self._min_z = point[2]
-    return self._min_z
+    return self.bounding_box.lower_corner[2]
 
   @property
   def min_y(self):
@@ -195,13 +149,7 @@ class Polyhedron:
     Get polyhedron minimal y value in meters
     :return: float
     """
-    if self._min_y is None:
-      self._min_y = self.max_y
-      for polygon in self._polygons:
-        for point in polygon.coordinates:
-          if self._min_y > point[1]:
-            self._min_y = point[1]
-    return self._min_y
+    return self.bounding_box.lower_corner[1]
 
   @property
   def min_x(self):
@@ -209,13 +157,7 @@ class Polyhedron:
     Get polyhedron minimal x value in meters
     :return: float
     """
-    if self._min_x is None:
-      self._min_x = self.max_x
-      for polygon in self._polygons:
-        for point in polygon.coordinates:
-          if self._min_x > point[0]:
-            self._min_x = point[0]
-    return self._min_x
+    return self.bounding_box.lower_corner[0]
 
   @property
   def centroid(self) -> Union[None, List[float]]:
@@ -0,0 +1,114 @@
+"""
+Prism module
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+
+from typing import List, Union
+
+import numpy as np
+
+from helpers.utils import signed_area
+
+
+class Prism:
+  """
+  Prism class
+  Right prism extruded from horizontal footprint rings, its volume, centroid and bounds are calculated in closed form
+  """
+
+  def __init__(self, footprints, min_z, max_z):
+    self._footprints = footprints
+    self._min_z = min_z
+    self._max_z = max_z
+    self._areas = None
+    self._volume = None
+    self._centroid = None
+
+  @property
+  def footprints(self) -> List[np.ndarray]:
+    """
+    Get the prism footprint rings [[x, y,...]], the holes bridged into them
+    :return: [np.ndarray]
+    """
+    return self._footprints
+
+  @property
+  def height(self) -> float:
+    """
+    Get prism height in meters
+    :return: float
+    """
+    return self._max_z - self._min_z
+
+  @property
+  def areas(self) -> List[float]:
+    """
+    Get the footprint rings area in square meters
+    :return: [float]
+    """
+    if self._areas is None:
+      self._areas = [abs(signed_area(footprint)) for footprint in self._footprints]
+    return self._areas
+
+  @property
+  def volume(self) -> float:
+    """
+    Get prism volume in cubic meters
+    :return: float
+    """
+    if self._volume is None:
+      self._volume = sum(self.areas) * self.height
+    return self._volume
+
+  @property
+  def centroid(self) -> Union[None, List[float]]:
+    """
+    Get prism centroid, None if the footprint has no area
+    :return: [x,y,z]
+    """
+    if self._centroid is None:
+      area = sum(self.areas)
+      if area == 0:
+        return None
+      moment_x = 0
+      moment_y = 0
+      for footprint in self._footprints:
+        x = footprint[:, 0]
+        y = footprint[:, 1]
+        next_x = np.roll(x, -1)
+        next_y = np.roll(y, -1)
+        cross_products = x * next_y - next_x * y
+        # the centroid moments have the sign of the ring area, so they are oriented as the area
+        sign = np.sign(cross_products.sum())
+        moment_x += sign * np.dot(x + next_x, cross_products) / 6
+        moment_y += sign * np.dot(y + next_y, cross_products) / 6
+      self._centroid = [float(moment_x / area), float(moment_y / area), (self._min_z + self._max_z) / 2]
+    return self._centroid
+
+  @property
+  def lower_corner(self) -> List[float]:
+    """
+    Get prism lower corner [x, y, z]
+    :return: [float]
+    """
+    lower_corner = np.min([footprint[:, :2].min(axis=0) for footprint in self._footprints], axis=0)
+    return [float(lower_corner[0]), float(lower_corner[1]), self._min_z]
+
+  @property
+  def upper_corner(self) -> List[float]:
+    """
+    Get prism upper corner [x, y, z]
+    :return: [float]
+    """
+    upper_corner = np.max([footprint[:, :2].max(axis=0) for footprint in self._footprints], axis=0)
+    return [float(upper_corner[0]), float(upper_corner[1]), self._max_z]
+
+  @property
+  def max_z(self) -> float:
+    """
+    Get prism maximal z value in meters
+    :return: float
+    """
+    return self._max_z
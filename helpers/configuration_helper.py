@@ -5,17 +5,70 @@ Copyright © 2022 Concordia CERC group
 Project Coder Guille Gutierrez guillermo.gutierrezmorote@concordia.ca
 """
 import configparser
+import logging
+import os
+import threading
 from pathlib import Path
+from types import MappingProxyType
 
 
 class ConfigurationHelper:
   """
   Configuration class
+  The configuration file is read once per process and its values shared by all the instances,
+  the file can be replaced with the HIPATIA_CONFIGURATION environment variable or by reloading it
   """
+  _ENVIRONMENT_VARIABLE = 'HIPATIA_CONFIGURATION'
+  _DEFAULT_PATH = Path(Path(__file__).parent.parent / 'config/configuration.ini').resolve()
+  _shared_values = None
+  _lock = threading.Lock()
+
   def __init__(self):
-    config_file = Path(Path(__file__).parent.parent / 'config/configuration.ini').resolve()
-    self._config = configparser.ConfigParser()
-    self._config.read(config_file)
+    if ConfigurationHelper._shared_values is None:
+      with ConfigurationHelper._lock:
+        if ConfigurationHelper._shared_values is None:
+          ConfigurationHelper._shared_values = self._read(self.path())
+    self._values = ConfigurationHelper._shared_values
+
+  @staticmethod
+  def path() -> Path:
+    """
+    Get the configuration file path, the HIPATIA_CONFIGURATION environment variable one if set
+    :return: Path
+    """
+    path = os.environ.get(ConfigurationHelper._ENVIRONMENT_VARIABLE)
+    if path is None:
+      return ConfigurationHelper._DEFAULT_PATH
+    return Path(path).resolve()
+
+  @staticmethod
+  def reload(path=None):
+    """
+    Read the configuration file again, the new values are used by the instances created afterward
+    :param path: configuration file, the environment variable or default one if not given
+    :return: None
+    """
+    if path is None:
+      path = ConfigurationHelper.path()
+    values = ConfigurationHelper._read(Path(path))
+    with ConfigurationHelper._lock:
+      ConfigurationHelper._shared_values = values
+
+  @staticmethod
+  def _read(path):
+    if not path.is_file():
+      error_message = f'Configuration file [{path}] not found'
+      logging.error(error_message)
+      raise FileNotFoundError(error_message)
+    config = configparser.ConfigParser()
+    config.read(path)
+    values = {option: config.getfloat('buildings', option) for option in config.options('buildings')}
+    return MappingProxyType(values)
+
+  @staticmethod
+  def _after_fork():
+    # the lock may have been held by another thread of the parent process, the values are immutable and kept
+    ConfigurationHelper._lock = threading.Lock()
 
   @property
   def min_coordinate(self) -> float:
@@ -23,7 +76,7 @@ class ConfigurationHelper:
     Get configured minimal coordinate value
     :return: -1.7976931348623157e+308
     """
-    return self._config.getfloat('buildings', 'min_coordinate')
+    return self._values['min_coordinate']
 
   @property
   def max_coordinate(self) -> float:
@@ -31,7 +84,7 @@ class ConfigurationHelper:
     Get configured maximal coordinate value
     :return: 1.7976931348623157e+308
     """
-    return self._config.getfloat('buildings', 'max_coordinate').real
+    return self._values['max_coordinate']
 
   @property
   def comnet_lighting_latent(self) -> float:
@@ -39,7 +92,7 @@ class ConfigurationHelper:
     Get configured latent ratio of internal gains do to lighting used for Comnet (ASHRAE) standard
     :return: 0
     """
-    return self._config.getfloat('buildings', 'comnet_lighting_latent').real
+    return self._values['comnet_lighting_latent']
 
   @property
   def comnet_lighting_convective(self) -> float:
@@ -47,7 +100,7 @@ class ConfigurationHelper:
     Get configured convective ratio of internal gains do to lighting used for Comnet (ASHRAE) standard
     :return: 0.5
     """
-    return self._config.getfloat('buildings', 'comnet_lighting_convective').real
+    return self._values['comnet_lighting_convective']
 
   @property
   def comnet_lighting_radiant(self) -> float:
@@ -55,7 +108,7 @@ class ConfigurationHelper:
     Get configured radiant ratio of internal gains do to lighting used for Comnet (ASHRAE) standard
     :return: 0.5
     """
-    return self._config.getfloat('buildings', 'comnet_lighting_radiant').real
+    return self._values['comnet_lighting_radiant']
 
   @property
   def comnet_plugs_latent(self) -> float:
@@ -63,7 +116,7 @@ class ConfigurationHelper:
     Get configured latent ratio of internal gains do to electrical appliances used for Comnet (ASHRAE) standard
     :return: 0
     """
-    return self._config.getfloat('buildings', 'comnet_plugs_latent').real
+    return self._values['comnet_plugs_latent']
 
   @property
   def comnet_plugs_convective(self) -> float:
@@ -71,7 +124,7 @@ class ConfigurationHelper:
     Get configured convective ratio of internal gains do to electrical appliances used for Comnet (ASHRAE) standard
     :return: 0.75
     """
-    return self._config.getfloat('buildings', 'comnet_plugs_convective').real
+    return self._values['comnet_plugs_convective']
 
   @property
   def comnet_plugs_radiant(self) -> float:
@@ -79,7 +132,7 @@ class ConfigurationHelper:
     Get configured radiant ratio of internal gains do to electrical appliances used for Comnet (ASHRAE) standard
     :return: 0.25
     """
-    return self._config.getfloat('buildings', 'comnet_plugs_radiant').real
+    return self._values['comnet_plugs_radiant']
 
   @property
   def comnet_occupancy_sensible_convective(self) -> float:
@@ -88,7 +141,7 @@ class ConfigurationHelper:
     used for Comnet (ASHRAE) standard
     :return: 0.9
     """
-    return self._config.getfloat('buildings', 'comnet_occupancy_sensible_convective').real
+    return self._values['comnet_occupancy_sensible_convective']
 
   @property
   def comnet_occupancy_sensible_radiant(self) -> float:
@@ -97,7 +150,7 @@ class ConfigurationHelper:
     used for Comnet (ASHRAE) standard
     :return: 0.1
     """
-    return self._config.getfloat('buildings', 'comnet_occupancy_sensible_radiant').real
+    return self._values['comnet_occupancy_sensible_radiant']
 
   @property
   def convective_heat_transfer_coefficient_interior(self) -> float:
@@ -105,7 +158,7 @@ class ConfigurationHelper:
     Get configured convective heat transfer coefficient for surfaces inside the building
     :return: 3.5 W/m2K
     """
-    return self._config.getfloat('buildings', 'convective_heat_transfer_coefficient_interior').real
+    return self._values['convective_heat_transfer_coefficient_interior']
 
   @property
   def convective_heat_transfer_coefficient_exterior(self) -> float:
@@ -113,7 +166,7 @@ class ConfigurationHelper:
     Get configured convective heat transfer coefficient for surfaces outside the building
     :return: 20 W/m2K
     """
-    return self._config.getfloat('buildings', 'convective_heat_transfer_coefficient_exterior').real
+    return self._values['convective_heat_transfer_coefficient_exterior']
 
   @property
   def soil_conductivity(self) -> float:
@@ -121,7 +174,7 @@ class ConfigurationHelper:
     Get configured soil conductivity for surfaces touching the ground
     :return: 3 W/mK
     """
-    return self._config.getfloat('buildings', 'soil_conductivity').real
+    return self._values['soil_conductivity']
 
   @property
   def soil_thickness(self) -> float:
@@ -129,7 +182,7 @@ class ConfigurationHelper:
     Get configured soil thickness for surfaces touching the ground
     :return: 0.5 m
     """
-    return self._config.getfloat('buildings', 'soil_thickness').real
+    return self._values['soil_thickness']
 
   @property
   def short_wave_reflectance(self) -> float:
@@ -137,7 +190,16 @@ class ConfigurationHelper:
     Get configured short wave reflectance for surfaces that don't have construction assigned
     :return: 0.3
     """
-    return self._config.getfloat('buildings', 'short_wave_reflectance').real
+    return self._values['short_wave_reflectance']
+
+  @property
+  def min_building_floor_area(self) -> float:
+    """
+    Get configured minimal floor area for a feature to be imported as a building,
+    smaller ones are considered small building-like structures
+    :return: 25 m2
+    """
+    return self._values['min_building_floor_area']
 
   @property
   def cold_water_temperature(self) -> float:
@@ -145,4 +207,8 @@ class ConfigurationHelper:
     Get configured cold water temperature in Celsius
     :return: 10
     """
-    return self._config.getfloat('buildings', 'cold_water_temperature').real
+    return self._values['cold_water_temperature']
+
+
+if hasattr(os, 'register_at_fork'):
+  os.register_at_fork(after_in_child=ConfigurationHelper._after_fork)
@@ -5,6 +5,7 @@ Copyright © 2022 Concordia CERC group
 Project Coder Guille Gutierrez guillermo.gutierrezmorote@concordia.ca
 Code contributors: Pilar Monsalvete Alvarez de Uribarri pilar.monsalvete@concordia.ca
 """
+import logging
 import math
 from pathlib import Path
 from typing import Dict
@@ -14,6 +15,8 @@ from trimesh import Trimesh
 from trimesh import intersections
 import numpy as np
 
+from helpers.adjacency_helper import AdjacencyHelper
+from helpers.attributes.adjacency_graph import AdjacencyGraph
 from helpers.attributes.polygon import Polygon
 from helpers.attributes.polyhedron import Polyhedron
 from helpers.location import Location
@@ -84,32 +87,115 @@ class GeometryHelper:
     :param city: current city
     :return: None
     """
-    factor = GeometryHelper.factor()
-    return MapPoint(
-      ((coordinate[0] - city.lower_corner[0]) * factor), ((coordinate[1] - city.lower_corner[1]) * factor)
-    )
+    return GeometryHelper._map_point(coordinate, city.lower_corner, GeometryHelper.factor())
+
+  @staticmethod
+  def _map_point(coordinate, lower_corner, factor):
+    return MapPoint(((coordinate[0] - lower_corner[0]) * factor), ((coordinate[1] - lower_corner[1]) * factor))
 
   @staticmethod
-  def city_mapping(city, building_names=None, plot=False) -> Dict:
+  def city_mapping(city, building_names=None, plot=False, method='segments', workers=None) -> Dict:
     """
+    Map the footprint lines shared by the city buildings
     :param city: city to be mapped
     :param building_names: list of building names to be mapped or None
-    :param plot: True if minimap image should be displayed
+    :param plot: True if minimap image should be displayed, only for the raster method
+    :param method: 'segments' to compare the footprint segments or 'raster' to rasterize them into a minimap
+    :param workers: number of processes sharing the district tiles, only for the segments method
     :return: shared_information dictionary
     """
-    lines_information = {}
     if building_names is None:
       building_names = [b.name for b in city.buildings]
+    if method == 'segments':
+      return GeometryHelper._segments_mapping(city, building_names, workers)
+    if method == 'raster':
+      return GeometryHelper._raster_mapping(city, building_names, plot)
+    logging.error('Unknown city mapping method %s', method)
+    raise ValueError(f'Unknown city mapping method {method}')
+
+  @staticmethod
+  def _segments_mapping(city, building_names, workers) -> Dict:
+    lines_information = {}
+    buildings = [city.city_object(building_name) for building_name in building_names]
+    starts, ends, owners = AdjacencyHelper.footprints(buildings)
+    first, second, shared_lengths, shared_starts, shared_ends = AdjacencyHelper.shared_segments(
+      starts, ends, owners, workers=workers
+    )
     factor = GeometryHelper.factor()
-    x = math.ceil((city.upper_corner[0] - city.lower_corner[0]) * factor) + 1
-    y = math.ceil((city.upper_corner[1] - city.lower_corner[1]) * factor) + 1
-    city_map = [['' for _ in range(y + 1)] for _ in range(x + 1)]
-    map_info = [[{} for _ in range(y + 1)] for _ in range(x + 1)]
-    img = Image.new('RGB', (x + 1, y + 1), "black")  # create a new black image
-    city_image = img.load()  # create the pixel map
+    # same minimap points as coordinate_to_map_point, with the city lower corner calculated once
+    lower_corner = np.asarray(city.lower_corner[:2])
+    segments = np.unique(np.concatenate((first, second)))
+    map_starts = ((starts[segments] - lower_corner) * factor).astype(int).tolist()
+    map_ends = ((ends[segments] - lower_corner) * factor).astype(int).tolist()
+    map_points = {
+      segment: (f'({start[0]}, {start[1]})', f'({end[0]}, {end[1]})')
+      for segment, start, end in zip(segments.tolist(), map_starts, map_ends)
+    }
+    neighbours = {}
+    for segment, neighbour_segment, shared_length in zip(first.tolist(), second.tolist(), shared_lengths.tolist()):
+      for building_segment, other_segment in [(segment, neighbour_segment), (neighbour_segment, segment)]:
+        building = buildings[owners[building_segment]]
+        neighbour = buildings[owners[other_segment]]
+        coordinate_start, coordinate_end = map_points[building_segment]
+        neighbour_start, neighbour_end = map_points[other_segment]
+        key = f'{neighbour.name}_{neighbour_start}_{coordinate_start}'
+        building_lines = lines_information.setdefault(building.name, {})
+        if key in building_lines:
+          # segments starting in the same minimap point share the key, as in the raster method
+          building_lines[key]['shared_length'] += shared_length
+          building_lines[key]['shared_points'] = int(building_lines[key]['shared_length'] * factor * 2)
+          continue
+        building_lines[key] = {
+          'neighbour_name': neighbour.name,
+          'line_start': tuple(starts[building_segment].tolist()),
+          'line_end': tuple(ends[building_segment].tolist()),
+          'neighbour_line_start': tuple(starts[other_segment].tolist()),
+          'neighbour_line_end': tuple(ends[other_segment].tolist()),
+          'coordinate_start': coordinate_start,
+          'coordinate_end': coordinate_end,
+          'neighbour_start': neighbour_start,
+          'neighbour_end': neighbour_end,
+          'shared_points': int(shared_length * factor * 2),
+          'shared_length': shared_length
+        }
+        neighbours.setdefault(building, {})[neighbour] = None
+    if buildings == city.buildings:
+      # the whole district is mapped, its buildings neighbours come from the adjacency graph
+      city.adjacency_graph = AdjacencyGraph.from_pairs(buildings, owners[first], owners[second], shared_lengths,
+                                                       shared_starts, shared_ends)
+    else:
+      GeometryHelper._store_neighbours(neighbours)
+    return lines_information
+
+  @staticmethod
+  def _store_neighbours(neighbours):
+    """
+    Add the found neighbours to the buildings ones, without repetitions and in the order they were found
+    :param neighbours: {building: {neighbour: None}}
+    :return: None
+    """
+    for building, building_neighbours in neighbours.items():
+      known = building.neighbours
+      if known is None:
+        known = []
+      known_set = set(known)
+      building.neighbours = known + [neighbour for neighbour in building_neighbours if neighbour not in known_set]
+
+  @staticmethod
+  def _raster_mapping(city, building_names, plot) -> Dict:
+    lines_information = {}
+    factor = GeometryHelper.factor()
+    lower_corner = city.lower_corner
+    upper_corner = city.upper_corner
+
+    def map_point(coordinate):
+      return f'{GeometryHelper._map_point(coordinate, lower_corner, factor)}'
+
+    # only the minimap cells touched by the footprints are stored, so the memory depends on the perimeters
+    city_map = {}
+    neighbours = {}
     for building_name in building_names:
       building = city.city_object(building_name)
-      line = 0
       for ground in building.grounds:
         length = len(ground.perimeter_polygon.coordinates) - 1
         for i, coordinate in enumerate(ground.perimeter_polygon.coordinates):
@@ -124,26 +210,22 @@ class GeometryHelper:
             continue
           delta_x = (next_coordinate[0] - coordinate[0]) / steps
           delta_y = (next_coordinate[1] - coordinate[1]) / steps
+          line_start = (coordinate[0], coordinate[1])
+          line_end = (next_coordinate[0], next_coordinate[1])
 
           for k in range(0, steps):
             new_coordinate = (coordinate[0] + (delta_x * k), coordinate[1] + (delta_y * k))
-            point = GeometryHelper.coordinate_to_map_point(new_coordinate, city)
-            x = point.x
-            y = point.y
-            if city_map[x][y] == '':
-              city_map[x][y] = building.name
-              map_info[x][y] = {
-                'line_start': (coordinate[0], coordinate[1]),
-                'line_end': (next_coordinate[0], next_coordinate[1]),
-              }
-              city_image[x, y] = (100, 0, 0)
-            elif city_map[x][y] != building.name:
-              neighbour = city.city_object(city_map[x][y])
-              neighbour_info = map_info[x][y]
+            point = GeometryHelper._map_point(new_coordinate, lower_corner, factor)
+            cell = (point.x, point.y)
+            if cell not in city_map:
+              city_map[cell] = (building.name, line_start, line_end)
+            elif city_map[cell][0] != building.name:
+              neighbour_name, neighbour_line_start, neighbour_line_end = city_map[cell]
+              neighbour = city.city_object(neighbour_name)
 
               # prepare the keys
-              neighbour_start_coordinate = f'{GeometryHelper.coordinate_to_map_point(neighbour_info["line_start"], city)}'
-              building_start_coordinate = f'{GeometryHelper.coordinate_to_map_point(coordinate, city)}'
+              neighbour_start_coordinate = map_point(neighbour_line_start)
+              building_start_coordinate = map_point(coordinate)
               neighbour_key = f'{neighbour.name}_{neighbour_start_coordinate}_{building_start_coordinate}'
               building_key = f'{building.name}_{building_start_coordinate}_{neighbour_start_coordinate}'
 
@@ -156,14 +238,14 @@ class GeometryHelper:
                   lines_information[building.name] = {}
                 lines_information[building.name][neighbour_key] = {
                   'neighbour_name': neighbour.name,
-                  'line_start': (coordinate[0], coordinate[1]),
-                  'line_end': (next_coordinate[0], next_coordinate[1]),
-                  'neighbour_line_start': neighbour_info['line_start'],
-                  'neighbour_line_end': neighbour_info['line_end'],
-                  'coordinate_start': f"{GeometryHelper.coordinate_to_map_point(coordinate, city)}",
-                  'coordinate_end': f"{GeometryHelper.coordinate_to_map_point(next_coordinate, city)}",
-                  'neighbour_start': f"{GeometryHelper.coordinate_to_map_point(neighbour_info['line_start'], city)}",
-                  'neighbour_end': f"{GeometryHelper.coordinate_to_map_point(neighbour_info['line_end'], city)}",
+                  'line_start': line_start,
+                  'line_end': line_end,
+                  'neighbour_line_start': neighbour_line_start,
+                  'neighbour_line_end': neighbour_line_end,
+                  'coordinate_start': building_start_coordinate,
+                  'coordinate_end': map_point(next_coordinate),
+                  'neighbour_start': neighbour_start_coordinate,
+                  'neighbour_end': map_point(neighbour_line_end),
                   'shared_points': 1
                 }
 
@@ -176,28 +258,28 @@ class GeometryHelper:
                   lines_information[neighbour.name] = {}
                 lines_information[neighbour.name][building_key] = {
                   'neighbour_name': building.name,
-                  'line_start': neighbour_info['line_start'],
-                  'line_end': neighbour_info['line_end'],
-                  'neighbour_line_start': (coordinate[0], coordinate[1]),
-                  'neighbour_line_end': (next_coordinate[0], next_coordinate[1]),
-                  'neighbour_start': f"{GeometryHelper.coordinate_to_map_point(coordinate, city)}",
-                  'neighbour_end': f"{GeometryHelper.coordinate_to_map_point(next_coordinate, city)}",
-                  'coordinate_start': f"{GeometryHelper.coordinate_to_map_point(neighbour_info['line_start'], city)}",
-                  'coordinate_end': f"{GeometryHelper.coordinate_to_map_point(neighbour_info['line_end'], city)}",
+                  'line_start': neighbour_line_start,
+                  'line_end': neighbour_line_end,
+                  'neighbour_line_start': line_start,
+                  'neighbour_line_end': line_end,
+                  'neighbour_start': building_start_coordinate,
+                  'neighbour_end': map_point(next_coordinate),
+                  'coordinate_start': neighbour_start_coordinate,
+                  'coordinate_end': map_point(neighbour_line_end),
                   'shared_points': 1
                 }
 
-              if building.neighbours is None:
-                building.neighbours = [neighbour]
-              elif neighbour not in building.neighbours:
-                building.neighbours.append(neighbour)
-              if neighbour.neighbours is None:
-                neighbour.neighbours = [building]
-              elif building not in neighbour.neighbours:
-                neighbour.neighbours.append(building)
-          line += 1
+              neighbours.setdefault(building, {})[neighbour] = None
+              neighbours.setdefault(neighbour, {})[building] = None
 
+    GeometryHelper._store_neighbours(neighbours)
     if plot:
+      x = math.ceil((upper_corner[0] - lower_corner[0]) * factor) + 1
+      y = math.ceil((upper_corner[1] - lower_corner[1]) * factor) + 1
+      img = Image.new('RGB', (x + 1, y + 1), "black")  # create a new black image
+      city_image = img.load()  # create the pixel map
+      for cell in city_map:
+        city_image[cell] = (100, 0, 0)
       img.show()
     return lines_information
 
@@ -0,0 +1,259 @@
+"""
+Triangulation helper
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from helpers.utils import signed_area
+
+
+class TriangulationHelper:
+  """
+  TriangulationHelper class
+  Triangulates simple polygons without an external engine, the convex ones as a fan from their first vertex
+  and the concave ones by ear clipping, both in the polygon plane given by its normal
+  The faces are cached by the shape of the projected ring, so every congruent polygon (same storey walls,
+  storey copies of a footprint) reuses them
+  """
+  # collinearity and point in triangle tolerance, relative to the squared polygon size
+  _TOLERANCE = 1e-10
+  # projected coordinates quantization in meters for the cache keys
+  _QUANTUM = 1e-6
+  _cache = OrderedDict()
+  _cache_size = 8192
+  _cache_lock = threading.Lock()
+  _NOT_CACHED = object()
+  _hits = 0
+  _misses = 0
+
+  @staticmethod
+  def cache_info() -> dict:
+    """
+    Get the triangulation cache hits, misses, current size and maximal size
+    :return: dict
+    """
+    with TriangulationHelper._cache_lock:
+      return {
+        'hits': TriangulationHelper._hits,
+        'misses': TriangulationHelper._misses,
+        'size': len(TriangulationHelper._cache),
+        'max_size': TriangulationHelper._cache_size
+      }
+
+  @staticmethod
+  def set_cache_size(size):
+    """
+    Set the maximal number of triangulations in the cache, the least recently used are evicted first, 0 disables it
+    :param size: int
+    :return: None
+    """
+    if size < 0:
+      raise ValueError(f'Triangulation cache size must be positive, [{size}] given')
+    with TriangulationHelper._cache_lock:
+      TriangulationHelper._cache_size = size
+      while len(TriangulationHelper._cache) > size:
+        TriangulationHelper._cache.popitem(last=False)
+
+  @staticmethod
+  def clear_cache():
+    """
+    Remove all the triangulations from the cache and reset its counters
+    :return: None
+    """
+    with TriangulationHelper._cache_lock:
+      TriangulationHelper._cache.clear()
+      TriangulationHelper._hits = 0
+      TriangulationHelper._misses = 0
+
+  @staticmethod
+  def _cross(vector_1, vector_2):
+    return vector_1[..., 0] * vector_2[..., 1] - vector_1[..., 1] * vector_2[..., 0]
+
+  @staticmethod
+  def _edges(points):
+    """
+    Get the vectors from each vertex to the next one
+    :return: np.ndarray
+    """
+    return np.concatenate((points[1:], points[:1])) - points
+
+  @staticmethod
+  def _turns(edges):
+    """
+    Get the cross product of the edges arriving to and leaving each vertex, positive for the convex vertices
+    of a counterclockwise ring
+    :return: np.ndarray
+    """
+    return TriangulationHelper._cross(np.concatenate((edges[-1:], edges[:-1])), edges)
+
+  @staticmethod
+  @lru_cache(maxsize=None)
+  def _fan(length):
+    """
+    Get the triangles of a convex polygon from its first vertex, shared by all the polygons with the same vertices
+    :return: np.ndarray
+    """
+    faces = np.column_stack((np.zeros(length - 2, dtype=int), np.arange(1, length - 1), np.arange(2, length)))
+    faces.flags.writeable = False
+    return faces
+
+  @staticmethod
+  def project(vertices, normal) -> np.ndarray:
+    """
+    Get the vertices projected in the plane normal to the given vector, relative to the first vertex
+    so a polygon following the right hand rule around the normal is counterclockwise
+    :param vertices: [[x, y, z]]
+    :param normal: [x, y, z] unit vector
+    :return: np.ndarray [[u, v]]
+    """
+    normal_x, normal_y, normal_z = (float(component) for component in normal)
+    # first axis normal to the normal and to the coordinate axis closest to the plane, the second one completes the base
+    if abs(normal_x) <= abs(normal_y) and abs(normal_x) <= abs(normal_z):
+      u_axis = (0.0, normal_z, -normal_y)
+    elif abs(normal_y) <= abs(normal_z):
+      u_axis = (-normal_z, 0.0, normal_x)
+    else:
+      u_axis = (normal_y, -normal_x, 0.0)
+    norm = math.sqrt(u_axis[0] ** 2 + u_axis[1] ** 2 + u_axis[2] ** 2)
+    u_x, u_y, u_z = (component / norm for component in u_axis)
+    base = np.array([[u_x, normal_y * u_z - normal_z * u_y],
+                     [u_y, normal_z * u_x - normal_x * u_z],
+                     [u_z, normal_x * u_y - normal_y * u_x]])
+    vertices = np.asarray(vertices, dtype=float)
+    return (vertices - vertices[0]) @ base
+
+  @staticmethod
+  def triangulate(vertices, normal, fallback=None) -> Optional[np.ndarray]:
+    """
+    Get the triangular faces of a simple polygon, oriented as the normal
+    The polygons with repeated vertices (holes bridged into the outer ring) or without area are not triangulated,
+    but passed to the fallback triangulation if given
+    :param vertices: [[x, y, z]]
+    :param normal: [x, y, z] polygon normal
+    :param fallback: function(vertices, normal) returning the faces of the polygons not triangulated
+    :return: np.ndarray [[vertex index, vertex index, vertex index]] read only or None
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    if len(vertices) < 3 or not any(normal):
+      if fallback is None:
+        return None
+      return fallback(vertices, normal)
+    points = TriangulationHelper.project(vertices, normal)
+    # the projection starts at the origin and its axes only depend on the normal, so the congruent polygons
+    # with the same vertices order have the same key
+    key = np.round(points / TriangulationHelper._QUANTUM).astype(np.int64).tobytes()
+    faces = TriangulationHelper._cached_faces(key)
+    store = faces is TriangulationHelper._NOT_CACHED
+    if store:
+      faces = TriangulationHelper._triangulate(vertices, points)
+    if faces is None and fallback is not None:
+      store = True
+      faces = np.array(fallback(vertices, normal))
+      faces.flags.writeable = False
+    if store:
+      TriangulationHelper._cache_faces(key, faces)
+    return faces
+
+  @staticmethod
+  def _cached_faces(key):
+    with TriangulationHelper._cache_lock:
+      if key not in TriangulationHelper._cache:
+        TriangulationHelper._misses += 1
+        return TriangulationHelper._NOT_CACHED
+      TriangulationHelper._hits += 1
+      TriangulationHelper._cache.move_to_end(key)
+      return TriangulationHelper._cache[key]
+
+  @staticmethod
+  def _cache_faces(key, faces):
+    with TriangulationHelper._cache_lock:
+      if TriangulationHelper._cache_size == 0:
+        return
+      TriangulationHelper._cache[key] = faces
+      TriangulationHelper._cache.move_to_end(key)
+      if len(TriangulationHelper._cache) > TriangulationHelper._cache_size:
+        TriangulationHelper._cache.popitem(last=False)
+
+  @staticmethod
+  def _triangulate(vertices, points) -> Optional[np.ndarray]:
+    length = len(vertices)
+    if len(set(map(tuple, vertices.tolist()))) < length:
+      return None
+    edges = TriangulationHelper._edges(points)
+    size = np.abs(edges).max()
+    tolerance = TriangulationHelper._TOLERANCE * size * size
+    # the ring starts at the origin, so its area is the sum of the triangles from the origin to each edge
+    turns = TriangulationHelper._turns(edges)
+    area = TriangulationHelper._cross(points, edges).sum() / 2
+    if abs(area) <= tolerance:
+      return None
+    if area > 0 and (turns > tolerance).all():
+      return TriangulationHelper._fan(length)
+    # the triangles are counterclockwise in the projection, so the polygons turning against the normal are reversed
+    if area < 0:
+      faces = TriangulationHelper._ear_clipping(points[::-1], tolerance)
+      if faces is not None:
+        faces = length - 1 - faces
+    else:
+      faces = TriangulationHelper._ear_clipping(points, tolerance)
+    if faces is not None:
+      faces.flags.writeable = False
+    return faces
+
+  @staticmethod
+  def _ear_clipping(points, tolerance) -> Optional[np.ndarray]:
+    """
+    Get the triangles of a counterclockwise simple ring by clipping its ears
+    All the ears are found at once and the ones not adjacent to each other are clipped together,
+    as clipping an ear only changes its two neighbours
+    :return: np.ndarray or None if the ring is not simple
+    """
+    remaining = np.arange(len(points))
+    faces = []
+    while len(remaining) > 3:
+      ring = points[remaining]
+      previous_points = np.concatenate((ring[-1:], ring[:-1]))
+      next_points = np.concatenate((ring[1:], ring[:1]))
+      convex = TriangulationHelper._turns(next_points - ring) > tolerance
+      candidates = np.flatnonzero(convex)
+      # only a reflex or collinear vertex can be in the triangle of a convex vertex that is not an ear
+      blockers = ring[~convex][np.newaxis]
+      if len(candidates) > 0 and blockers.shape[1] > 0:
+        corner_1 = previous_points[candidates][:, np.newaxis]
+        corner_2 = ring[candidates][:, np.newaxis]
+        corner_3 = next_points[candidates][:, np.newaxis]
+        inside = ((TriangulationHelper._cross(corner_2 - corner_1, blockers - corner_1) >= -tolerance)
+                  & (TriangulationHelper._cross(corner_3 - corner_2, blockers - corner_2) >= -tolerance)
+                  & (TriangulationHelper._cross(corner_1 - corner_3, blockers - corner_3) >= -tolerance))
+        inside &= ~(np.all(blockers == corner_1, axis=2) | np.all(blockers == corner_3, axis=2))
+        candidates = candidates[~inside.any(axis=1)]
+      if len(candidates) == 0:
+        if abs(signed_area(ring)) <= tolerance:
+          # only collinear vertices are left
+          return np.array(faces, dtype=int).reshape(-1, 3)
+        return None
+      ears = []
+      for candidate in candidates.tolist():
+        if len(ears) == len(remaining) - 3:
+          break
+        if ears and candidate == ears[-1] + 1:
+          continue
+        if ears and ears[0] == 0 and candidate == len(remaining) - 1:
+          continue
+        ears.append(candidate)
+      ears = np.array(ears)
+      faces.extend(np.column_stack((remaining[ears - 1],
+                                    remaining[ears],
+                                    remaining[(ears + 1) % len(remaining)])).tolist())
+      remaining = np.delete(remaining, ears)
+    if abs(signed_area(points[remaining])) > tolerance:
+      faces.append(remaining.tolist())
+    return np.array(faces, dtype=int).reshape(-1, 3)
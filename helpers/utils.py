@@ -7,6 +7,8 @@ Project Coder Peter Yefi peteryefi@gmail.com
 
 import logging
 
+import numpy as np
+
 
 def validate_import_export_type(cls_name: type, handler: str):
   """
@@ -26,3 +28,44 @@ def validate_import_export_type(cls_name: type, handler: str):
     error_message = f'Wrong import type [{handler}]. Valid functions include {functions}'
     logging.error(error_message)
     raise ValueError(error_message)
+
+
+def signed_area(points):
+  """
+  Get the signed area of the ring projected in the xy plane with the shoelace formula, positive if counterclockwise
+  The ring can be open or closed, the repeated last vertex adds nothing
+  :param points: [[x, y,...]]
+  :return: float
+  """
+  points = np.asarray(points, dtype=float)
+  x = points[:, 0]
+  y = points[:, 1]
+  return float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]) + x[-1] * y[0] - x[0] * y[-1]) / 2
+
+
+def weld_vertices(coordinates):
+  """
+  Get the distinct vertices in the order they are first found and the index of each coordinate in them
+  :param coordinates: [[x, y, z]]
+  :return: np.ndarray vertices, np.ndarray indexes
+  """
+  coordinates = np.asarray(coordinates).reshape(-1, 3)
+  # adding zero turns -0.0 into 0.0, so both are the same vertex
+  _, first, inverse = np.unique(coordinates + 0.0, axis=0, return_index=True, return_inverse=True)
+  # np.unique sorts the vertices, they are reordered as first found
+  order = np.argsort(first)
+  ranks = np.empty_like(order)
+  ranks[order] = np.arange(len(order))
+  return coordinates[first[order]], ranks[inverse.reshape(-1)]
+
+
+def triangular_faces(indexes):
+  """
+  Get the triangular faces given by the vertex indexes of their corners, a vertex repeated in a face is replaced by -1
+  :param indexes: [vertex index], three per face
+  :return: [[int]]
+  """
+  faces = np.asarray(indexes).reshape(-1, 3).copy()
+  faces[:, 2] = np.where((faces[:, 2] == faces[:, 0]) | (faces[:, 2] == faces[:, 1]), -1, faces[:, 2])
+  faces[:, 1] = np.where(faces[:, 1] == faces[:, 0], -1, faces[:, 1])
+  return faces.tolist()
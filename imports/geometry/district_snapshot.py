@@ -0,0 +1,238 @@
+"""
+District snapshot module stores an imported district as a compact binary cache and loads it back
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from central_data_model.building import Building
+from central_data_model.building_demand.surface import Surface
+from central_data_model.district import District
+from helpers.attributes.polygon import Polygon
+from helpers.attributes.prism import Prism
+from imports.geometry.helpers.imports_geometry_helper import GeometryHelper as igh
+
+
+class DistrictSnapshot:
+  """
+  DistrictSnapshot class
+  The snapshot is a folder in the cache path named after the content of the input file and the import parameters.
+  The coordinates are stored as contiguous float arrays and the building attributes as columns,
+  together with the precomputed areas, normals, angles, volumes and prisms, so they are memory-mapped instead of parsed
+  """
+  _VERSION = 4
+
+  def __init__(self, cache_path, path, parameters):
+    self._cache_path = Path(cache_path)
+    self._path = path
+    self._parameters = parameters
+    self._key = None
+
+  @property
+  def key(self) -> str:
+    """
+    Get the snapshot key as the hash of the input files content and the import parameters
+    :return: str
+    """
+    if self._key is None:
+      digest = hashlib.blake2b()
+      for file in igh.geojson_files(self._path):
+        digest.update(file.name.encode('utf8'))
+        with open(file, 'rb') as input_file:
+          for chunk in iter(lambda: input_file.read(1 << 20), b''):
+            digest.update(chunk)
+      parameters = json.dumps({'version': self._VERSION, 'parameters': self._parameters}, sort_keys=True, default=str)
+      digest.update(parameters.encode('utf8'))
+      self._key = digest.hexdigest()[:32]
+    return self._key
+
+  @property
+  def snapshot_path(self) -> Path:
+    """
+    Get the snapshot folder
+    :return: Path
+    """
+    return self._cache_path / self.key
+
+  def load(self) -> Union[None, District]:
+    """
+    Load the district from the snapshot
+    :return: None if there is no snapshot or District
+    """
+    snapshot_path = self.snapshot_path
+    if not (snapshot_path / 'attributes.json').exists():
+      return None
+    with open(snapshot_path / 'attributes.json', 'r', encoding='utf8') as attributes_file:
+      attributes = json.load(attributes_file)
+    arrays = {}
+    for name in ['coordinates', 'polygon_offsets', 'surface_offsets', 'areas', 'normals', 'azimuths',
+                 'zenith_angles', 'surface_types', 'volumes', 'years_of_construction', 'storeys_above_ground',
+                 'prism_coordinates', 'prism_ring_offsets', 'prism_offsets', 'prism_heights', 'district_polygon']:
+      arrays[name] = np.load(snapshot_path / f'{name}.npy', mmap_mode='r')
+
+    coordinates = arrays['coordinates']
+    polygon_offsets = arrays['polygon_offsets']
+    surface_offsets = arrays['surface_offsets']
+    areas = arrays['areas']
+    normals = arrays['normals']
+    azimuths = arrays['azimuths'].tolist()
+    zenith_angles = arrays['zenith_angles'].tolist()
+    lower_corners, upper_corners = self._corners(coordinates, polygon_offsets)
+    prism_coordinates = arrays['prism_coordinates']
+    prism_ring_offsets = arrays['prism_ring_offsets']
+    prism_offsets = arrays['prism_offsets']
+    prism_heights = arrays['prism_heights']
+    surface_types = [attributes['surface_types'][code] for code in arrays['surface_types']]
+    district = District(attributes['srs_name'])
+    district.reference_coordinates = attributes['reference_coordinates']
+    if attributes['district_polygon_area'] is not None:
+      district.polygon = Polygon(arrays['district_polygon'])
+      district.polygon.area = attributes['district_polygon_area']
+    for i, name in enumerate(attributes['names']):
+      surfaces = []
+      for j in range(surface_offsets[i], surface_offsets[i + 1]):
+        polygon = Polygon(coordinates[polygon_offsets[j]:polygon_offsets[j + 1]])
+        polygon.area = float(areas[j])
+        polygon.normal = normals[j]
+        surface = Surface(polygon, polygon, surface_type=surface_types[j])
+        surface.azimuth = azimuths[j]
+        surface.zenith_angle = zenith_angles[j]
+        surface.lower_corner = lower_corners[j]
+        surface.upper_corner = upper_corners[j]
+        surfaces.append(surface)
+      year_of_construction = None
+      if not np.isnan(arrays['years_of_construction'][i]):
+        year_of_construction = int(arrays['years_of_construction'][i])
+      building = Building(name, surfaces, year_of_construction, attributes['functions'][i])
+      for alias in attributes['aliases'][i]:
+        building.add_alias(alias)
+      building.fingerprint = attributes['fingerprints'][i]
+      if not np.isnan(prism_heights[i, 0]):
+        footprints = [np.array(prism_coordinates[prism_ring_offsets[k]:prism_ring_offsets[k + 1]])
+                      for k in range(prism_offsets[i], prism_offsets[i + 1])]
+        building.prism = Prism(footprints, float(prism_heights[i, 0]), float(prism_heights[i, 1]))
+      if not np.isnan(arrays['volumes'][i]):
+        building.volume = float(arrays['volumes'][i])
+      if arrays['storeys_above_ground'][i] >= 0:
+        building.storeys_above_ground = int(arrays['storeys_above_ground'][i])
+      district.add_building(building)
+    return district
+
+  def save(self, district):
+    """
+    Save the district into the snapshot, the snapshot folder is replaced at once when complete
+    :param district: District
+    :return: None
+    """
+    self._cache_path.mkdir(parents=True, exist_ok=True)
+    surface_types = []
+    polygons = []
+    areas = []
+    normals = []
+    azimuths = []
+    zenith_angles = []
+    types = []
+    surface_offsets = [0]
+    volumes = []
+    prism_footprints = []
+    prism_offsets = [0]
+    prism_heights = []
+    for building in district.buildings:
+      # only the extruded buildings know their volume, the rest would need the whole mesh to know it
+      if building.prism is not None:
+        volumes.append(building.volume)
+        prism_footprints.extend(np.asarray(footprint, dtype=float)[:, :2] for footprint in building.prism.footprints)
+        prism_heights.append((building.prism.lower_corner[2], building.prism.max_z))
+      else:
+        volumes.append(np.nan)
+        prism_heights.append((np.nan, np.nan))
+      prism_offsets.append(len(prism_footprints))
+      for surface in building.surfaces:
+        polygons.append(np.asarray(surface.perimeter_polygon.coordinates, dtype=float).reshape(-1, 3))
+        # the area given by the importer, the Newell one is only right for the planar polygons
+        areas.append(surface.perimeter_polygon.area)
+        normals.append(surface.perimeter_polygon.normal)
+        azimuths.append(surface.azimuth)
+        zenith_angles.append(surface.zenith_angle)
+        if surface.type not in surface_types:
+          surface_types.append(surface.type)
+        types.append(surface_types.index(surface.type))
+      surface_offsets.append(len(polygons))
+    polygon_offsets = np.concatenate(([0], np.cumsum([len(polygon) for polygon in polygons]))).astype(np.int64)
+    coordinates = np.zeros((0, 3))
+    if len(polygons) > 0:
+      coordinates = np.concatenate(polygons)
+    prism_ring_offsets = np.concatenate(([0], np.cumsum([len(footprint) for footprint in prism_footprints])))
+    prism_coordinates = np.zeros((0, 2))
+    if len(prism_footprints) > 0:
+      prism_coordinates = np.concatenate(prism_footprints)
+
+    arrays = {
+      'coordinates': coordinates,
+      'polygon_offsets': polygon_offsets,
+      'surface_offsets': np.asarray(surface_offsets, dtype=np.int64),
+      'areas': np.asarray(areas, dtype=float),
+      'normals': np.asarray(normals, dtype=float).reshape(-1, 3),
+      'azimuths': np.asarray(azimuths, dtype=float),
+      'zenith_angles': np.asarray(zenith_angles, dtype=float),
+      'surface_types': np.asarray(types, dtype=np.int16),
+      'volumes': np.asarray(volumes, dtype=float),
+      'years_of_construction': np.asarray([np.nan if building.year_of_construction is None
+                                           else building.year_of_construction
+                                           for building in district.buildings], dtype=float),
+      'storeys_above_ground': np.asarray([-1 if building.storeys_above_ground is None
+                                          else building.storeys_above_ground
+                                          for building in district.buildings], dtype=np.int64),
+      'prism_coordinates': prism_coordinates,
+      'prism_ring_offsets': prism_ring_offsets.astype(np.int64),
+      'prism_offsets': np.asarray(prism_offsets, dtype=np.int64),
+      'prism_heights': np.asarray(prism_heights, dtype=float).reshape(-1, 2),
+      'district_polygon': np.zeros((0, 3))
+    }
+    attributes = {
+      'srs_name': district.srs_name,
+      'reference_coordinates': [float(value) for value in district.reference_coordinates],
+      'district_polygon_area': None,
+      'surface_types': surface_types,
+      'names': [building.name for building in district.buildings],
+      'functions': [building.function for building in district.buildings],
+      'aliases': [building.aliases for building in district.buildings],
+      'fingerprints': [building.fingerprint for building in district.buildings]
+    }
+    if district.polygon is not None:
+      arrays['district_polygon'] = np.asarray(district.polygon.coordinates, dtype=float)
+      attributes['district_polygon_area'] = float(district.polygon.area)
+
+    temporary_path = Path(tempfile.mkdtemp(dir=self._cache_path))
+    try:
+      for name, array in arrays.items():
+        np.save(temporary_path / f'{name}.npy', array)
+      with open(temporary_path / 'attributes.json', 'w', encoding='utf8') as attributes_file:
+        json.dump(attributes, attributes_file, default=str)
+      if self.snapshot_path.exists():
+        shutil.rmtree(self.snapshot_path)
+      os.replace(temporary_path, self.snapshot_path)
+    except OSError as err:
+      logging.error('Not able to save the district snapshot %s: %s', self.snapshot_path, err)
+      shutil.rmtree(temporary_path, ignore_errors=True)
+
+  @staticmethod
+  def _corners(coordinates, polygon_offsets):
+    """
+    Get the polygons lower and upper corners, computed at once for all the polygons
+    :return: [[x, y, z]], [[x, y, z]]
+    """
+    if len(coordinates) == 0:
+      return [], []
+    return (np.minimum.reduceat(coordinates, polygon_offsets[:-1], axis=0).tolist(),
+            np.maximum.reduceat(coordinates, polygon_offsets[:-1], axis=0).tolist())
@@ -4,20 +4,49 @@ SPDX - License - Identifier: LGPL - 3.0 - or -later
 Copyright © 2022 Concordia CERC group
 Project Coder Guillermo Gutierrez Guillermo.GutierrezMorote@concordia.ca
 """
+import hashlib
+import itertools
 import json
+import logging
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-from pyproj import Transformer
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
 
 from central_data_model.district import District
+from helpers.configuration_helper import ConfigurationHelper
+from helpers.utils import signed_area
 from imports.geometry.geojson_classes.geojson_lod0 import GeoJsonLOD0
 from imports.geometry.geojson_classes.geojson_lod1 import GeoJsonLOD1
+from imports.geometry.helpers.geojson_feature_reader import GeojsonFeatureReader
+from imports.geometry.helpers.imports_geometry_helper import GeometryHelper as igh
+
+_worker_geojson = None
+
+
+def _initialize_worker(geojson):
+  global _worker_geojson
+  _worker_geojson = geojson
+
+
+def _parse_features_in_worker(features):
+  return _worker_geojson.parse_chunk(features)
+
+
+def _parse_tile_in_worker(path):
+  return _worker_geojson.parse_tile(path)
 
 
 class Geojson:
   """
   Geojson class
+  The path can be a geojson file, a folder with geojson tiles, a glob pattern or a list of files,
+  the tiles are merged into a single district and the buildings repeated in several tiles are imported once
   """
+  _BATCH_SIZE = 1024
 
   def __init__(self,
                path,
@@ -30,16 +59,25 @@ class Geojson:
                storey_height_field=None,
                function_to_hub=None,
                usages_to_hub=None,
-               hub_crs=None
+               hub_crs=None,
+               workers=None,
+               window=None,
+               window_crs=None,
+               clip_to_boundaries=False,
+               min_floor_area=None,
+               json_backend=None
                ):
     self._hub_crs = hub_crs
     if hub_crs is None:
       self._hub_crs = 'epsg:2062'
     self._transformer = Transformer.from_crs('epsg:4326', self._hub_crs)
 
+    self._path = path
+    self._paths = igh.geojson_files(path)
     self._district = None
     self._district_polygon = None
-    self._buildings = []
+    # todo: re-structure so the reference comes automatically from the geojson read
+    self._reference_coordinates = [374480.491975, 218839.658365, 0]
 
     self._aliases_field = aliases_field
     self._extrusion_height_field = extrusion_height_field
@@ -50,127 +88,409 @@ class Geojson:
     self._storey_height_field = storey_height_field
     self._function_to_hub = function_to_hub
     self._usages_to_hub = usages_to_hub
-    with open(path, 'r', encoding='utf8') as json_file:
-      self._geojson = json.loads(json_file.read())
+    self._workers = workers
+    self._parser = self._new_parser()
+    self._window = self._project_window(window, window_crs)
+    self._clip_to_boundaries = clip_to_boundaries
+    self._features_window = self._window
+    self._min_floor_area = min_floor_area
+    if min_floor_area is None:
+      self._min_floor_area = ConfigurationHelper().min_building_floor_area
+    self._known_fingerprints = set()
+    self._unchanged_fingerprints = set()
+    self._json_backend = json_backend
+
+  def __getstate__(self):
+    # the workers only need the parsing configuration
+    state = self.__dict__.copy()
+    state['_district'] = None
+    state['_district_polygon'] = None
+    return state
+
+  def _new_parser(self):
+    if self._extrusion_height_field is None:
+      return GeoJsonLOD0(self._transformer, self._reference_coordinates)
+    return GeoJsonLOD1(self._transformer, self._reference_coordinates)
+
+  def _project_window(self, window, window_crs):
+    """
+    Get the query window in the hub coordinate system relative to the reference coordinates
+    :param window: None, [min_x, min_y, max_x, max_y] bounding box or [[x, y],...] polygon
+    :param window_crs: window coordinate reference system, WGS84 as (longitude, latitude) if None
+    :return: None or shapely geometry
+    """
+    if window is None:
+      return None
+    if len(window) == 4 and all(np.isscalar(value) for value in window):
+      window = shapely.box(*window)
+    else:
+      window = shapely.Polygon(window)
+    if window_crs is None:
+      window_crs = 'epsg:4326'
+    transformer = None
+    if CRS(window_crs) != CRS(self._hub_crs):
+      transformer = Transformer.from_crs(window_crs, self._hub_crs, always_xy=True)
+      # densify the window so its edges are kept once projected
+      min_x, min_y, max_x, max_y = window.bounds
+      window = shapely.segmentize(window, max(max_x - min_x, max_y - min_y) / 64)
+    reference_x = self._reference_coordinates[0]
+    reference_y = self._reference_coordinates[1]
+
+    def _to_hub(coordinates):
+      x, y = coordinates[:, 0], coordinates[:, 1]
+      if transformer is not None:
+        x, y = transformer.transform(x, y)
+      return np.column_stack((np.asarray(x) - reference_x, np.asarray(y) - reference_y))
+
+    return shapely.transform(window, _to_hub)
+
+  def _boundaries_window(self):
+    """
+    Get the district boundaries in the hub coordinate system relative to the reference coordinates
+    The boundaries feature can be anywhere in the file, so it is searched in a preliminary reading
+    :return: None or shapely geometry
+    """
+    for feature in itertools.chain.from_iterable(GeojsonFeatureReader(path, self._json_backend) for path in self._paths):
+      if self._type_of_feature(feature) == 'boundaries':
+        rings = [polygon[0] for polygon in self._polygons(feature['geometry'])]
+        return shapely.union_all([shapely.Polygon(ring[:, :2]) for ring in self._parser.project_rings(rings)])
+    logging.warning('No boundaries feature found in %s, the buildings are not clipped to the district', self._path)
+    return None
+
+  def _in_window(self, polygons):
+    """
+    Check if a feature intersects the query window, rejecting first the ones whose extent is out of the window
+    :param polygons: [[ring]] projected feature polygons
+    :return: Boolean
+    """
+    if self._features_window is None:
+      return True
+    outer_rings = [polygon[0] for polygon in polygons]
+    coordinates = np.concatenate(outer_rings)
+    min_x, min_y = coordinates[:, :2].min(axis=0)
+    max_x, max_y = coordinates[:, :2].max(axis=0)
+    window_min_x, window_min_y, window_max_x, window_max_y = self._features_window.bounds
+    if max_x < window_min_x or min_x > window_max_x or max_y < window_min_y or min_y > window_max_y:
+      return False
+    for ring in outer_rings:
+      if self._features_window.intersects(shapely.Polygon(ring[:, :2])):
+        return True
+    return False
+
+  @staticmethod
+  def _footprint_area(polygons):
+    """
+    Get the footprint area of the projected feature polygons in square meters, holes excluded
+    :param polygons: [[ring]] projected closed rings
+    :return: float
+    """
+    area = 0
+    for polygon in polygons:
+      for i, ring in enumerate(polygon):
+        ring_area = abs(signed_area(ring))
+        if i == 0:
+          area += ring_area
+        else:
+          area -= ring_area
+    return float(area)
+
+  def _type_of_feature(self, feature):
+    if self._type_of_feature_field is None:
+      return None
+    return feature['properties'][self._type_of_feature_field]
+
+  def _fingerprint(self, feature):
+    """
+    Get the fingerprint of a geojson feature from its id, its original geometry and the mapped properties,
+    so a feature with the same fingerprint always results in the same building
+    :return: str
+    """
+    properties = feature['properties']
+    fields = [self._extrusion_height_field, self._year_of_construction_field, self._type_of_feature_field,
+              self._function_field, self._usages_field, self._storey_height_field]
+    if self._aliases_field is not None:
+      fields.extend(self._aliases_field)
+    content = {
+      'id': feature.get('id'),
+      'properties_id': properties.get('id'),
+      'geometry': feature['geometry'],
+      'properties': {field: properties[field] for field in fields if field is not None and field in properties}
+    }
+    content = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(content.encode('utf8'), digest_size=16).hexdigest()
+
+  @staticmethod
+  def _feature_id(feature):
+    """
+    Get the geojson feature id
+    :return: None or feature id
+    """
+    if 'id' in feature:
+      return feature['id']
+    if 'id' in feature['properties']:
+      return feature['properties']['id']
+    return None
+
+  @staticmethod
+  def _polygons(geometry):
+    """
+    Get the polygons in a geojson geometry as lists of rings
+    :return: [[ring]]
+    """
+    if str(geometry['type']).lower() == 'polygon':
+      return [geometry['coordinates']]
+    if str(geometry['type']).lower() == 'multipolygon':
+      return geometry['coordinates']
+    raise NotImplementedError(f'Geojson geometry type [{geometry["type"]}] unknown')
+
+  def _parse_features(self, features):
+    """
+    Parse a batch of geojson features, projecting the coordinates of all of them at once
+    :return: [Building]
+    """
+    features = [feature for feature in features if self._type_of_feature(feature) in ('building', 'boundaries')]
+    # the fingerprint is taken before the coordinates are projected
+    fingerprints = [self._fingerprint(feature) for feature in features]
+    if len(self._known_fingerprints) > 0:
+      changed_features = []
+      changed_fingerprints = []
+      for feature, fingerprint in zip(features, fingerprints):
+        if self._type_of_feature(feature) == 'building' and fingerprint in self._known_fingerprints:
+          self._unchanged_fingerprints.add(fingerprint)
+          continue
+        changed_features.append(feature)
+        changed_fingerprints.append(fingerprint)
+      features = changed_features
+      fingerprints = changed_fingerprints
+    rings = []
+    for feature in features:
+      for polygon in self._polygons(feature['geometry']):
+        rings.extend(polygon)
+    projected_rings = iter(self._parser.project_rings(rings))
+    buildings = []
+    for feature, fingerprint in zip(features, fingerprints):
+      geometry = feature['geometry']
+      polygons = [[next(projected_rings) for _ in polygon] for polygon in self._polygons(geometry)]
+      if self._type_of_feature(feature) == 'building' and not self._in_window(polygons):
+        continue
+      if str(geometry['type']).lower() == 'polygon':
+        polygons = polygons[0]
+      feature['geometry'] = {'type': geometry['type'], 'coordinates': polygons}
+      building = self._parse_feature(feature)
+      if building is not None:
+        building.fingerprint = fingerprint
+        buildings.append(building)
+    return buildings
+
+  def parse_chunk(self, features):
+    """
+    Parse a chunk of geojson features independently of the previous ones, as done by the parallel workers
+    :return: [Building], None or Building with the district boundaries, fingerprints of the unchanged features
+    """
+    return self._parse_batches([features])
+
+  def parse_tile(self, path):
+    """
+    Parse all the geojson features in a tile file, as done by the parallel workers
+    :return: [Building], None or Building with the district boundaries, fingerprints of the unchanged features
+    """
+    return self._parse_batches(self._batches([path]))
+
+  def _parse_batches(self, batches):
+    self._district_polygon = None
+    self._unchanged_fingerprints = set()
+    self._parser = self._new_parser()
+    buildings = []
+    for batch in batches:
+      buildings.extend(self._parse_features(batch))
+    return buildings, self._district_polygon, self._unchanged_fingerprints
+
+  def _parse_feature(self, feature):
+    """
+    Parse one geojson feature with projected coordinates, the district boundaries are kept apart as district polygon
+    :return: None or Building
+    """
+    properties = feature['properties']
+    type_of_feature = self._type_of_feature(feature)
+    if type_of_feature == 'boundaries' and self._district_polygon is not None:
+      logging.warning('More than one polygon defining the district, only the first one is kept')
+      return None
+
+    year_of_construction = None
+    if self._year_of_construction_field is not None:
+      year_of_construction = int(properties[self._year_of_construction_field])
+
+    function = None
+    if self._function_field is not None:
+      function = str(properties[self._function_field])
+      if self._function_to_hub is not None:
+        if function in self._function_to_hub:
+          function = self._function_to_hub[function]
+
+    usages = None
+    if self._usages_field is not None:
+      if self._usages_field in properties:
+        usages = properties[self._usages_field]
+        if self._usages_to_hub is not None:
+          usages = self._usages_to_hub(usages)
+
+    building_name = self._feature_id(feature)
+    if building_name is None:
+      building_name = uuid.uuid4()
+
+    building_aliases = []
+    if self._aliases_field is not None:
+      for alias_field in self._aliases_field:
+        building_aliases.append(properties[alias_field])
+
+    geometry = feature['geometry']
+    extrusion_height = None
+    storey_height = None
+    storeys = 1
+    if self._extrusion_height_field is not None:
+      extrusion_height = float(properties[self._extrusion_height_field])
+      if self._storey_height_field is not None:
+        storey_height = float(properties[self._storey_height_field])
+        storeys = int(extrusion_height / storey_height)
+
+    if type_of_feature == 'building':
+      # Do not include "small building-like structures" to buildings, checked before any extrusion
+      floor_area = self._footprint_area(self._polygons(geometry)) * storeys
+      if floor_area < self._min_floor_area:
+        return None
+
+    if self._extrusion_height_field is None:
+      city_object = self._parser.parse(geometry,
+                                       building_name,
+                                       building_aliases,
+                                       function,
+                                       usages,
+                                       year_of_construction)
+    else:
+      city_object = self._parser.parse(geometry,
+                                       building_name,
+                                       building_aliases,
+                                       function,
+                                       usages,
+                                       year_of_construction,
+                                       extrusion_height,
+                                       storey_height)
+
+    if type_of_feature == 'boundaries':
+      self._district_polygon = city_object
+      return None
+    return city_object
+
+  def iter_buildings(self):
+    """
+    Iterate over the buildings in the Geojson file, reading and parsing the features in small batches,
+    so the buildings can be processed and discarded without holding the whole district in memory
+    The boundaries feature is not yielded but kept as district polygon
+    Only the buildings intersecting the query window and, if requested, the district boundaries are parsed
+    :return: iterator of Building
+    """
+    self._district_polygon = None
+    self._unchanged_fingerprints = set()
+    if self._clip_to_boundaries:
+      self._features_window = self._boundaries_window()
+      if self._features_window is not None and self._window is not None:
+        self._features_window = self._features_window.intersection(self._window)
+    if self._features_window is not None:
+      shapely.prepare(self._features_window)
+    names = set()
+    for building in self._parse_buildings():
+      if building.name in names:
+        # the buildings straddling the tile edges are in several tiles, the first one is kept
+        logging.debug('Building %s repeated, ignored', building.name)
+        continue
+      names.add(building.name)
+      yield building
+
+  def _parse_buildings(self):
+    if self._workers is None or self._workers <= 1:
+      for batch in self._batches(self._paths):
+        yield from self._parse_features(batch)
+      return
+    if len(self._paths) > 1:
+      # one task per tile, so the tiles are also read in parallel
+      tasks = [(_parse_tile_in_worker, path) for path in self._paths]
+    else:
+      tasks = ((_parse_features_in_worker, batch) for batch in self._batches(self._paths))
+    with ProcessPoolExecutor(max_workers=self._workers,
+                             initializer=_initialize_worker,
+                             initargs=(self,)) as executor:
+      pending = deque()
+      for function, argument in tasks:
+        pending.append(executor.submit(function, argument))
+        # limit the chunks in flight so the memory stays bounded
+        if len(pending) >= 2 * self._workers:
+          yield from self._merge_chunk(*pending.popleft().result())
+      while len(pending) > 0:
+        yield from self._merge_chunk(*pending.popleft().result())
+
+  def _batches(self, paths):
+    features = itertools.chain.from_iterable(GeojsonFeatureReader(path, self._json_backend) for path in paths)
+    while True:
+      batch = list(itertools.islice(features, self._BATCH_SIZE))
+      if len(batch) == 0:
+        return
+      yield batch
+
+  def _merge_chunk(self, buildings, district_polygon, unchanged_fingerprints):
+    """
+    Merge the results of a chunk parsed in a worker, in the input order
+    :return: [Building]
+    """
+    self._unchanged_fingerprints.update(unchanged_fingerprints)
+    if district_polygon is not None:
+      if self._district_polygon is None:
+        self._district_polygon = district_polygon
+      else:
+        logging.warning('More than one polygon defining the district, only the first one is kept')
+    return buildings
 
   @property
   def district(self) -> District:
     """
     Get city out of a Geojson file
     """
-    # todo: re-structure so the reference comes automatically from the geojson read
-    reference_coordinates = [374480.491975, 218839.658365, 0]
-    parser = GeoJsonLOD0(self._transformer, reference_coordinates)
-    lod1_parser = GeoJsonLOD1(self._transformer, reference_coordinates)
-    lod = 0
     if self._district is None:
-      for feature in self._geojson['features']:
-        extrusion_height = None
-        storey_height = None
-        if self._extrusion_height_field is not None:
-          extrusion_height = float(feature['properties'][self._extrusion_height_field])
-          parser = lod1_parser
-          lod = 1
-          if self._storey_height_field is not None:
-            storey_height = float(feature['properties'][self._storey_height_field])
-
-        year_of_construction = None
-        if self._year_of_construction_field is not None:
-          year_of_construction = int(feature['properties'][self._year_of_construction_field])
-
-        type_of_feature = None
-        if self._type_of_feature_field is not None:
-          type_of_feature = feature['properties'][self._type_of_feature_field]
-
-        function = None
-        if self._function_field is not None:
-          function = str(feature['properties'][self._function_field])
-          if self._function_to_hub is not None:
-            if function in self._function_to_hub:
-              function = self._function_to_hub[function]
-
-        usages = None
-        if self._usages_field is not None:
-          if self._usages_field in feature['properties']:
-            usages = feature['properties'][self._usages_field]
-            if self._usages_to_hub is not None:
-              usages = self._usages_to_hub(usages)
-
-        geometry = feature['geometry']
-
-        if 'id' in feature:
-          building_name = feature['id']
-        elif 'id' in feature['properties']:
-          building_name = feature['properties']['id']
-        else:
-          building_name = uuid.uuid4()
-
-        building_aliases = []
-        if self._aliases_field is not None:
-          for alias_field in self._aliases_field:
-            building_aliases.append(feature['properties'][alias_field])
-
-        if lod == 0:
-          if lod == 0:
-            if type_of_feature == 'building':
-              self._buildings.append(parser.parse(
-                geometry,
-                building_name,
-                building_aliases,
-                function,
-                usages,
-                year_of_construction))
-            elif type_of_feature == 'boundaries':
-              if self._district_polygon is None:
-                self._district_polygon = parser.parse(
-                  geometry,
-                  building_name,
-                  building_aliases,
-                  function,
-                  usages,
-                  year_of_construction,
-                  extrusion_height,
-                  storey_height)
-              else:
-                # todo: catch the error
-                print("More than one polygon defining the district!!")
-            else:
-              # todo: will we have more types of features??
-              pass
-        else:
-          if type_of_feature == 'building':
-            self._buildings.append(
-              parser.parse(
-                geometry,
-                building_name,
-                building_aliases,
-                function,
-                usages,
-                year_of_construction,
-                extrusion_height,
-                storey_height))
-          elif type_of_feature == 'boundaries':
-            if self._district_polygon is None:
-              self._district_polygon = parser.parse(
-                geometry,
-                building_name,
-                building_aliases,
-                function,
-                usages,
-                year_of_construction,
-                extrusion_height,
-                storey_height)
-            else:
-              # todo: catch the error
-              print("More than one polygon defining the district!!")
-          else:
-            # todo: will we have more types of features??
-            pass
-    self._district = parser.district(self._hub_crs)
-    self._district.reference_coordinates = reference_coordinates
-    self._district.polygon = self._district_polygon.surfaces[0].perimeter_polygon
-    for building in self._buildings:
-      # Do not include "small building-like structures" to buildings
-      if building.floor_area >= 25:
-        self._district.add_building(building)
+      district = self._parser.district(self._hub_crs)
+      district.reference_coordinates = self._reference_coordinates
+      for building in self.iter_buildings():
+        district.add_building(building)
+      if self._district_polygon is not None:
+        district.polygon = self._district_polygon.surfaces[0].perimeter_polygon
+      self._district = district
     return self._district
+
+  def update_district(self, district) -> District:
+    """
+    Update a district previously imported with the same configuration to the content of the Geojson file
+    Only the features whose fingerprint changed are parsed, the buildings of the unchanged features are kept
+    as they are, with all their derived data, while the changed ones are replaced and the missing ones removed
+    :param district: District
+    :return: District
+    """
+    buildings = {}
+    for building in district.buildings:
+      if building.fingerprint is not None:
+        buildings[building.fingerprint] = building
+    self._known_fingerprints = set(buildings)
+    try:
+      new_buildings = list(self.iter_buildings())
+    finally:
+      self._known_fingerprints = set()
+    for building in list(district.buildings):
+      # the buildings not imported from a feature, added by the user or other importers, are kept
+      if building.fingerprint is not None and building.fingerprint not in self._unchanged_fingerprints:
+        district.remove_building(building)
+    for building in new_buildings:
+      district.add_building(building)
+    if self._district_polygon is not None:
+      district.polygon = self._district_polygon.surfaces[0].perimeter_polygon
+    logging.info('District updated from %s: %s buildings kept, %s removed and %s added', self._path,
+                 len(self._unchanged_fingerprints), len(buildings) - len(self._unchanged_fingerprints),
+                 len(new_buildings))
+    self._district = district
+    return district
@@ -7,8 +7,11 @@ Project Coder Guille Gutierrez guillermo.gutierrezmorote@concordia.ca
 
 from abc import ABC
 
+import numpy as np
+
 from central_data_model.district import District
-from helpers.geometry_helper import GeometryHelper
+from central_data_model.building_demand.surface import Surface
+from helpers.attributes.polygon import Polygon
 
 import helpers.constants as cte
 
@@ -19,78 +22,124 @@ class GeoJsonBase(ABC):
   """
   _X = 0
   _Y = 1
-  _min_x = cte.MAX_FLOAT
-  _min_y = cte.MAX_FLOAT
-  _max_x = cte.MIN_FLOAT
-  _max_y = cte.MIN_FLOAT
-  _max_z = 0
-
-  def _save_bounds(self, x, y):
-    self._max_x = max(x, self._max_x)
-    self._max_y = max(y, self._max_y)
-    self._min_x = min(x, self._min_x)
-    self._min_y = min(y, self._min_y)
+  # maximal height in meters of the wall points on the ground
+  _GROUND_HEIGHT = 0.5
+  # maximal distance in meters between a wall ground line and a mapped line ends
+  _WALL_TOLERANCE = 1e-2
 
   @staticmethod
-  def _find_wall(line_1, line_2):
-    if line_1 == [] or line_2 == []:
-      return False
-    for i in range(0, 2):
-      j = 1 - i
-      point_1 = line_1[i]
-      point_2 = line_2[j]
-      distance = GeometryHelper.distance_between_points(point_1, point_2)
-      if distance > 1e-2:
-        return False
-    return True
+  def _horizontal_surface(coordinates, area, surface_type):
+    """
+    Get a ground or roof surface with its normal, area, angles and bounds known in advance,
+    so they are not calculated again from the coordinates
+    :param coordinates: [[x, y, z]] horizontal ring, facing down for the grounds and up for the roofs
+    :param area: float
+    :param surface_type: Ground or Roof
+    :return: Surface
+    """
+    polygon = Polygon(coordinates)
+    polygon.area = area
+    zenith_angle = 0
+    polygon.normal = np.array([0.0, 0.0, 1.0])
+    if surface_type == cte.GROUND:
+      zenith_angle = np.pi
+      polygon.normal = np.array([0.0, 0.0, -1.0])
+    surface = Surface(polygon, polygon, surface_type=surface_type)
+    # the azimuth of a normal (0, 0, z)
+    surface.azimuth = np.pi / 2
+    surface.zenith_angle = zenith_angle
+    surface.lower_corner = coordinates.min(axis=0).tolist()
+    surface.upper_corner = coordinates.max(axis=0).tolist()
+    return surface
 
   def store_shared_percentage_to_walls(self, city, city_mapped):
-    for building in city.buildings:
-      if building.name not in city_mapped.keys():
-        for wall in building.walls:
-          wall.percentage_shared = 0
-        continue
-      building_mapped = city_mapped[building.name]
+    """
+    Store in the walls the fraction of their surface shared with the neighbours, all the walls at once
+    :param city: District
+    :param city_mapped: shared lines dictionary given by GeometryHelper.city_mapping
+    :return: None
+    """
+    walls = []
+    wall_buildings = []
+    coordinates = [np.empty((0, 3))]
+    for index, building in enumerate(city.buildings):
       for wall in building.walls:
-        percentage = 0
-        ground_line = []
-        for point in wall.perimeter_polygon.coordinates:
-          if point[2] < 0.5:
-            ground_line.append(point)
-        for entry in building_mapped:
-          if building_mapped[entry]['shared_points'] <= 2:
-            continue
-          line = [building_mapped[entry]['line_start'], building_mapped[entry]['line_end']]
-          neighbour_line = [building_mapped[entry]['neighbour_line_start'],
-                            building_mapped[entry]['neighbour_line_end']]
-          neighbour_height = city.city_object(building_mapped[entry]['neighbour_name']).max_height
-          if self._find_wall(line, ground_line):
-            line_shared = (GeometryHelper.distance_between_points(line[0], line[1]) +
-                           GeometryHelper.distance_between_points(neighbour_line[0], neighbour_line[1]) -
-                           GeometryHelper.distance_between_points(line[1], neighbour_line[0]) -
-                           GeometryHelper.distance_between_points(line[0], neighbour_line[1])) / 2
-            percentage_ground = line_shared / GeometryHelper.distance_between_points(line[0], line[1])
-            percentage_height = neighbour_height / building.max_height
-            percentage_height = min(percentage_height, 1)
-            percentage += percentage_ground * percentage_height
-        wall.percentage_shared = percentage
+        walls.append(wall)
+        wall_buildings.append(index)
+        coordinates.append(np.asarray(wall.perimeter_polygon.coordinates, dtype=float).reshape(-1, 3))
+    wall_counts = np.bincount(wall_buildings, minlength=len(city.buildings)).astype(np.int64)
+    # the ground line of each wall goes from its first to its second point on the ground
+    point_walls = np.repeat(np.arange(len(walls)), [len(wall_coordinates) for wall_coordinates in coordinates[1:]])
+    coordinates = np.concatenate(coordinates)
+    ground_points = np.nonzero(coordinates[:, 2] < self._GROUND_HEIGHT)[0]
+    first_ground_points = np.searchsorted(point_walls[ground_points], np.arange(len(walls)))
+    has_ground_line = np.bincount(point_walls[ground_points], minlength=len(walls)) >= 2
+    ground_starts = np.full((len(walls), 2), np.nan)
+    ground_ends = np.full((len(walls), 2), np.nan)
+    ground_starts[has_ground_line] = coordinates[ground_points[first_ground_points[has_ground_line]], :2]
+    ground_ends[has_ground_line] = coordinates[ground_points[first_ground_points[has_ground_line] + 1], :2]
+
+    # the mapped lines sharing more than two points
+    lines = []
+    line_buildings = []
+    heights = []
+    neighbour_heights = {}
+    for index, building in enumerate(city.buildings):
+      for entry in city_mapped.get(building.name, {}).values():
+        if entry['shared_points'] <= 2:
+          continue
+        neighbour_name = entry['neighbour_name']
+        if neighbour_name not in neighbour_heights:
+          neighbour_heights[neighbour_name] = city.city_object(neighbour_name).max_height
+        lines.append((entry['line_start'][:2], entry['line_end'][:2],
+                      entry['neighbour_line_start'][:2], entry['neighbour_line_end'][:2]))
+        line_buildings.append(index)
+        heights.append((neighbour_heights[neighbour_name], building.max_height))
+    lines = np.asarray(lines, dtype=float).reshape(-1, 4, 2)
+    line_buildings = np.asarray(line_buildings, dtype=np.int64)
+    heights = np.asarray(heights, dtype=float).reshape(-1, 2)
+
+    def distance(point_1, point_2):
+      delta = point_2 - point_1
+      return np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
 
-  def _polygon_coordinates_to_3d(self, polygon_coordinates, transformer, reference_coordinates):
-    transformed_coordinates = ''
-    for coordinate in polygon_coordinates:
-      transformed = transformer.transform(coordinate[self._Y], coordinate[self._X])
-      transformed = [transformed[self._X] - reference_coordinates[self._X], transformed[self._Y] - reference_coordinates[self._Y]]
-      self._save_bounds(transformed[self._X], transformed[self._Y])
-      transformed_coordinates = f'{transformed_coordinates} {transformed[self._X]} {transformed[self._Y]} 0.0'
-    return transformed_coordinates.lstrip(' ')
+    line_length = distance(lines[:, 0], lines[:, 1])
+    line_shared = (line_length + distance(lines[:, 2], lines[:, 3]) - distance(lines[:, 1], lines[:, 2]) -
+                   distance(lines[:, 0], lines[:, 3])) / 2
+    # the lines without length or of buildings without height add nothing to their walls percentage
+    valid_lines = (line_length > 0) & (heights[:, 1] > 0)
+    percentage_ground = np.divide(line_shared, line_length, out=np.zeros(len(lines)), where=valid_lines)
+    percentage_height = np.divide(heights[:, 0], heights[:, 1], out=np.zeros(len(lines)), where=valid_lines)
+    line_percentages = percentage_ground * np.minimum(percentage_height, 1)
 
-  @property
-  def lower_corner(self):
-    return [self._min_x, self._min_y, 0.0]
+    # each line is compared with the walls of its building, in the lines order
+    candidates = wall_counts[line_buildings]
+    pair_lines = np.repeat(np.arange(len(lines)), candidates)
+    first_walls = (np.cumsum(wall_counts) - wall_counts)[line_buildings]
+    pair_walls = (np.repeat(first_walls - np.cumsum(candidates) + candidates, candidates) +
+                  np.arange(len(pair_lines)))
+    found = ((distance(lines[pair_lines, 0], ground_ends[pair_walls]) <= self._WALL_TOLERANCE) &
+             (distance(lines[pair_lines, 1], ground_starts[pair_walls]) <= self._WALL_TOLERANCE))
+    percentages = np.bincount(pair_walls[found], weights=line_percentages[pair_lines[found]], minlength=len(walls))
+    for wall, percentage in zip(walls, percentages.tolist()):
+      wall.percentage_shared = percentage
 
-  @property
-  def upper_corner(self):
-    return [self._max_x, self._max_y, self._max_z]
+  def project_rings(self, rings):
+    """
+    Project the given rings from WGS84 to the hub coordinate system relative to the reference coordinates
+    All the rings are transformed in a single call
+    :param rings: [[[longitude, latitude],...]]
+    :return: [np.ndarray] one [[x, y, 0.0],...] array per ring
+    """
+    if len(rings) == 0:
+      return []
+    lengths = [len(ring) for ring in rings]
+    coordinates = np.concatenate([np.asarray(ring, dtype=float)[:, :2] for ring in rings])
+    x, y = self._transformer.transform(coordinates[:, self._Y], coordinates[:, self._X])
+    points = np.zeros((len(coordinates), 3))
+    points[:, self._X] = np.asarray(x) - self._reference_coordinates[self._X]
+    points[:, self._Y] = np.asarray(y) - self._reference_coordinates[self._Y]
+    return np.split(points, np.cumsum(lengths)[:-1])
 
   def district(self, hub_crs):
     return District(hub_crs)
@@ -1,54 +1,59 @@
+import numpy as np
+import shapely
+
 import helpers.constants as cte
-from helpers.attributes.polygon import Polygon
 from central_data_model.building import Building
-from central_data_model.building_demand.surface import Surface
-from helpers.geometry_helper import GeometryHelper
+from helpers.utils import signed_area
 from imports.geometry.geojson_classes.geojson_base import GeoJsonBase
 from imports.geometry.helpers.imports_geometry_helper import GeometryHelper as igh
 
 
 class GeoJsonLOD0(GeoJsonBase):
+  _MAX_DISTANCE_MATRIX_SIZE = 1 << 20
+
   def __init__(self, transformer, reference_coordinates):
     self._transformer = transformer
     self._reference_coordinates = reference_coordinates
 
-  def _add_polygon(self, polygon_coordinates, surfaces):
-    points = igh.points_from_string(
-      igh.remove_last_point_from_string(
-        self._polygon_coordinates_to_3d(polygon_coordinates, self._transformer, self._reference_coordinates)
-      )
-    )
-    points = igh.invert_points(points)
-    polygon = Polygon(points)
-    polygon.area = igh.ground_area(points)
-    surface = Surface(polygon, polygon)
-    if surface.type == cte.GROUND:
-      surfaces.append(surface)
-    else:
-      distance = cte.MAX_FLOAT
-      hole_connect = 0
-      surface_connect = 0
-      for hole_index, hole_coordinate in enumerate(polygon.coordinates):
-        for surface_index, ground_coordinate in enumerate(surfaces[-1].solid_polygon.coordinates):
-          current_distance = GeometryHelper.distance_between_points(hole_coordinate, ground_coordinate)
-          if current_distance < distance:
-            distance = current_distance
-            hole_connect = hole_index
-            surface_connect = surface_index
+  @staticmethod
+  def _bridge_vertices(ring, hole):
+    """
+    Get the closest pair of vertices between the hole and the ring, the first one in the hole order if several
+    :return: hole vertex index, ring vertex index
+    """
+    if len(hole) * len(ring) <= GeoJsonLOD0._MAX_DISTANCE_MATRIX_SIZE:
+      distances = ((hole[:, np.newaxis, :] - ring[np.newaxis, :, :]) ** 2).sum(axis=2)
+      hole_index, ring_index = np.unravel_index(np.argmin(distances), distances.shape)
+      return int(hole_index), int(ring_index)
+    # large rings are indexed in a tree instead of computing all the distances
+    tree = shapely.STRtree(shapely.points(ring[:, :2]))
+    (hole_indexes, ring_indexes), distances = tree.query_nearest(shapely.points(hole[:, :2]), return_distance=True)
+    closest = np.lexsort((ring_indexes, hole_indexes, distances))[0]
+    return int(hole_indexes[closest]), int(ring_indexes[closest])
 
-      hole = polygon.coordinates[hole_connect:] + polygon.coordinates[:hole_connect] + [
-        polygon.coordinates[hole_connect]]
-      prefix_coordinates = surfaces[-1].solid_polygon.coordinates[:surface_connect + 1]
-      trail_coordinates = surfaces[-1].solid_polygon.coordinates[surface_connect:]
-      coordinates = prefix_coordinates + hole + trail_coordinates
-      polygon = Polygon(coordinates)
-      polygon.area = igh.ground_area(coordinates)
-      surfaces[-1] = Surface(polygon, polygon)
+  def _ground_surfaces(self, rings):
+    """
+    Get the ground surfaces of the projected rings, the rings facing up once reversed are holes
+    that are bridged into the previous ground through their closest vertices, so each ground is a single ring
+    :return: [Surface]
+    """
+    grounds = []
+    for ring in rings:
+      # drop the closing point and reverse the ring so the ground faces down
+      points = ring[-2::-1]
+      if signed_area(points) <= 0 or len(grounds) == 0:
+        grounds.append(points)
+        continue
+      ground = grounds[-1]
+      hole_index, ground_index = self._bridge_vertices(ground, points)
+      grounds[-1] = np.concatenate((ground[:ground_index + 1],
+                                    points[hole_index:],
+                                    points[:hole_index + 1],
+                                    ground[ground_index:]))
+    return [self._horizontal_surface(ground, igh.ground_area(ground), cte.GROUND) for ground in grounds]
 
   def _parse_polygon(self, coordinates, building_name, building_aliases, function, usages, year_of_construction):
-    surfaces = []
-    for polygon_coordinates in coordinates:
-      self._add_polygon(polygon_coordinates, surfaces)
+    surfaces = self._ground_surfaces(coordinates)
     building = Building(f'{building_name}', surfaces, year_of_construction, function)
     for alias in building_aliases:
       building.add_alias(alias)
@@ -56,10 +61,7 @@ class GeoJsonLOD0(GeoJsonBase):
 
   def _parse_multi_polygon(self, polygons_coordinates, building_name, building_aliases, function, usages,
                            year_of_construction):
-    surfaces = []
-    for coordinates in polygons_coordinates:
-      for polygon_coordinates in coordinates:
-        self._add_polygon(polygon_coordinates, surfaces)
+    surfaces = self._ground_surfaces([ring for coordinates in polygons_coordinates for ring in coordinates])
     building = Building(f'{building_name}', surfaces, year_of_construction, function)
     for alias in building_aliases:
       building.add_alias(alias)
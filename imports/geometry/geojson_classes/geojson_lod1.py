@@ -1,6 +1,7 @@
+import helpers.constants as cte
 from helpers.attributes.polygon import Polygon
+from helpers.attributes.prism import Prism
 from central_data_model.building import Building
-from central_data_model.building_demand.internal_zone import InternalZone
 from central_data_model.building_demand.surface import Surface
 from imports.geometry.geojson_classes.geojson_base import GeoJsonBase
 from imports.geometry.geojson_classes.geojson_lod0 import GeoJsonLOD0
@@ -13,69 +14,95 @@ class GeoJsonLOD1(GeoJsonBase):
     self._reference_coordinates = reference_coordinates
     self._parser = GeoJsonLOD0(self._transformer, self._reference_coordinates)
 
+  @staticmethod
+  def _prism(footprint, heights):
+    """
+    Get the vertices of the extruded footprint as views of a single read-only array
+    :param footprint: [[x, y]] ground ring
+    :param heights: storey levels heights, from the ground to the roof
+    :return: levels [storey level, vertex, xyz], walls [storey, wall, vertex, xyz]
+    """
+    footprint_length = len(footprint)
+    storeys = len(heights) - 1
+    levels_size = len(heights) * footprint_length
+    vertices = np.empty((levels_size + storeys * footprint_length * 4, 3))
+    levels = vertices[:levels_size].reshape(len(heights), footprint_length, 3)
+    levels[:, :, :2] = footprint
+    levels[:, :, 2] = heights[:, np.newaxis]
+    # the walls follow the roof ring, the ground ring reversed, from each vertex to the next one
+    roof_footprint = footprint[::-1]
+    next_roof_footprint = np.roll(roof_footprint, -1, axis=0)
+    walls = vertices[levels_size:].reshape(storeys, footprint_length, 4, 3)
+    walls[:, :, 0, :2] = roof_footprint
+    walls[:, :, 1, :2] = next_roof_footprint
+    walls[:, :, 2, :2] = next_roof_footprint
+    walls[:, :, 3, :2] = roof_footprint
+    walls[:, :, :2, 2] = heights[:-1, np.newaxis, np.newaxis]
+    walls[:, :, 2:, 2] = heights[1:, np.newaxis, np.newaxis]
+    # the surfaces share the array, so it cannot be modified through one of them
+    # the views keep the flag they are taken with, so they are taken once the array is read-only
+    vertices.flags.writeable = False
+    return (vertices[:levels_size].reshape(len(heights), footprint_length, 3),
+            vertices[levels_size:].reshape(storeys, footprint_length, 4, 3))
+
+  @staticmethod
+  def _walls_metadata(footprint):
+    """
+    Get the walls normal, azimuth and horizontal bounds, the same for every storey
+    The walls are vertical quads following the roof ring, so their normal is the edge vector rotated clockwise
+    :param footprint: [[x, y]] ground ring
+    :return: normals, azimuths, edges length, lower xy corners, upper xy corners
+    """
+    roof_footprint = footprint[::-1]
+    next_roof_footprint = np.roll(roof_footprint, -1, axis=0)
+    edges = next_roof_footprint - roof_footprint
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    normals = np.zeros((len(footprint), 3))
+    # the normal of a wall without width is not defined, (0, 0, 0) as in Polygon.normal
+    valid = lengths > 0
+    normals[valid, 0] = edges[valid, 1] / lengths[valid]
+    normals[valid, 1] = -edges[valid, 0] / lengths[valid]
+    azimuths = np.pi / 2 - np.arctan2(normals[:, 1], normals[:, 0])
+    lower_corners = np.minimum(roof_footprint, next_roof_footprint)
+    upper_corners = np.maximum(roof_footprint, next_roof_footprint)
+    return normals, azimuths, lengths, lower_corners.tolist(), upper_corners.tolist()
+
   def parse(self, geometry, building_name, building_aliases, function, usages, year_of_construction, extrusion_height, storey_height):
-    self._max_z = max(self._max_z, extrusion_height)
     if storey_height is None:
       storey_height = extrusion_height
     storeys = int(extrusion_height/storey_height)
-    extrusion_height = storey_height * storeys
+    heights = storey_height * np.arange(storeys + 1)
 
     lod0_building = self._parser.parse(geometry, building_name, building_aliases, function, usages, year_of_construction)
-    volume = 0
     surfaces = []
-    internal_zones = []
+    footprints = []
     for ground in lod0_building.grounds:
       area = ground.solid_polygon.area
-      internal_volume = area * storey_height
+      footprint = np.asarray(ground.solid_polygon.coordinates)[:, :2]
+      footprints.append(footprint)
+      levels, walls = self._prism(footprint, heights)
+      normals, azimuths, lengths, lower_corners, upper_corners = self._walls_metadata(footprint)
+      areas = (lengths * storey_height).tolist()
       for storey in range(0, storeys):
-        roof_coordinates = []
-        floor_coordinates = []
-        zone = []
-        for coordinate in ground.solid_polygon.coordinates:
-          roof_coordinate = np.array([coordinate[0], coordinate[1], extrusion_height * (storey + 1)])
-          floor_coordinate = np.array([coordinate[0], coordinate[1], extrusion_height * storey])
-          # create the roof
-          roof_coordinates.insert(0, roof_coordinate)
-          # create the ground
-          floor_coordinates.append(floor_coordinate)
-        roof_polygon = Polygon(roof_coordinates)
-        floor_polygon = Polygon(floor_coordinates)
-        roof_polygon.area = area
-        floor_polygon.area = area
-        roof = Surface(roof_polygon, roof_polygon)
-        floor = Surface(floor_polygon, floor_polygon)
-        surfaces.append(roof)
-        surfaces.append(floor)
-        zone.append(roof)
-        zone.append(floor)
-        # adding a wall means add the point coordinates and the next point coordinates with Z's height and 0
-        coordinates_length = len(roof.solid_polygon.coordinates)
-        for i, coordinate in enumerate(roof.solid_polygon.coordinates):
-          j = i + 1
-          if j == coordinates_length:
-            j = 0
-          next_coordinate = roof.solid_polygon.coordinates[j]
-          wall_coordinates = [
-            np.array([coordinate[0], coordinate[1], extrusion_height * storey]),
-            np.array([next_coordinate[0], next_coordinate[1], extrusion_height * storey]),
-            np.array([next_coordinate[0], next_coordinate[1], next_coordinate[2]]),
-            np.array([coordinate[0], coordinate[1], coordinate[2]])
-          ]
+        # the roof faces up and the floor down
+        surfaces.append(self._horizontal_surface(levels[storey + 1, ::-1], area, cte.ROOF))
+        surfaces.append(self._horizontal_surface(levels[storey], area, cte.GROUND))
+        floor_height = float(heights[storey])
+        roof_height = float(heights[storey + 1])
+        for i, wall_coordinates in enumerate(walls[storey]):
           polygon = Polygon(wall_coordinates)
-          wall = Surface(polygon, polygon)
+          polygon.normal = normals[i]
+          polygon.area = areas[i]
+          wall = Surface(polygon, polygon, surface_type=cte.WALL)
+          wall.azimuth = azimuths[i]
+          wall.zenith_angle = np.pi / 2
+          wall.lower_corner = lower_corners[i] + [floor_height]
+          wall.upper_corner = upper_corners[i] + [roof_height]
           surfaces.append(wall)
-          zone.append(wall)
-
-        internal_zones.append(InternalZone(zone, area, internal_volume))
-      volume += internal_volume
 
     building = Building(f'{building_name}', surfaces, year_of_construction, function)
     for alias in building_aliases:
       building.add_alias(alias)
-    building.volume = volume
+    building.prism = Prism(footprints, 0, float(heights[-1]))
     building.storeys_above_ground = storeys
-    self._max_x = self._parser._max_x
-    self._max_y = self._parser._max_y
-    self._min_x = self._parser._min_x
-    self._min_y = self._parser._min_y
     return building
@@ -0,0 +1,207 @@
+"""
+Geojson feature reader reads the features of a geojson feature collection one at a time
+SPDX - License - Identifier: LGPL - 3.0 - or -later
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import json
+import logging
+import mmap
+import re
+
+JSON_BACKENDS = {'json': json.loads}
+try:
+  import orjson
+  JSON_BACKENDS['orjson'] = orjson.loads
+except ImportError:
+  pass
+try:
+  import simdjson
+  JSON_BACKENDS['simdjson'] = simdjson.loads
+except ImportError:
+  pass
+
+
+def _object_pattern(depth):
+  """
+  Get a regular expression matching a json object with up to the given nesting depth of objects in it
+  :return: re.Pattern
+  """
+  string = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+  pattern = rb'\{[^"{}]*(?:' + string + rb'[^"{}]*)*\}'
+  for _ in range(depth - 1):
+    pattern = rb'\{[^"{}]*(?:(?:' + string + rb'|' + pattern + rb')[^"{}]*)*\}'
+  return re.compile(pattern)
+
+
+class GeojsonFeatureReader:
+  """
+  GeojsonFeatureReader class
+  Iterating over the reader yields the features in the file one by one, so only the feature being read
+  is kept in memory instead of the whole feature collection
+  The file is memory-mapped and never decoded as a whole, the features are parsed in slices of the raw bytes
+  by the fastest json backend installed (orjson, simdjson or the standard json)
+  """
+  _CHUNK_SIZE = 1 << 20
+  _PREFERRED_BACKENDS = ['orjson', 'simdjson', 'json']
+  _WHITESPACE = re.compile(rb'[ \t\n\r]*')
+  _STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+  _SCALAR = re.compile(rb'[^,:{}\[\] \t\n\r]+')
+  # candidate end of a feature followed by the next one
+  _FEATURES_SEPARATOR = re.compile(rb'\}[ \t\n\r]*,[ \t\n\r]*\{')
+  # a feature (feature, properties and geometry objects) is usually matched at once
+  _OBJECT = _object_pattern(6)
+  # otherwise each match skips to the next opening (first group) or closing (second group) character out of the strings,
+  # the coordinates arrays do not have braces, so the objects are skipped over in a few matches
+  _NEXT_TOKEN = {
+    b'{': re.compile(rb'[^"{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}]*)*(?:(\{)|(\}))'),
+    b'[': re.compile(rb'[^"\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]]*)*(?:(\[)|(\]))')
+  }
+
+  def __init__(self, path, json_backend=None, chunk_size=None):
+    self._path = path
+    self._chunk_size = chunk_size
+    if chunk_size is None:
+      self._chunk_size = self._CHUNK_SIZE
+    if json_backend is None:
+      json_backend = next(backend for backend in self._PREFERRED_BACKENDS if backend in JSON_BACKENDS)
+    if json_backend not in JSON_BACKENDS:
+      error_message = f'Json backend [{json_backend}] not available. Available backends: {list(JSON_BACKENDS)}'
+      logging.error(error_message)
+      raise ValueError(error_message)
+    self._json_backend = json_backend
+    self._loads = JSON_BACKENDS[json_backend]
+    self._members = {}
+    self._data = None
+
+  @property
+  def json_backend(self) -> str:
+    """
+    Get the name of the json backend used to parse the features
+    :return: str
+    """
+    return self._json_backend
+
+  @property
+  def members(self) -> dict:
+    """
+    Get the feature collection members other than the features (type, name, crs...) read so far
+    :return: dict
+    """
+    return self._members
+
+  def __iter__(self):
+    with open(self._path, 'rb') as json_file:
+      if json_file.seek(0, 2) == 0:
+        raise self._error('Empty geojson file', 0)
+      with mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        self._data = data
+        try:
+          yield from self._feature_collection()
+        finally:
+          self._data = None
+
+  def _feature_collection(self):
+    position = 0
+    if self._data[0:3] == b'\xef\xbb\xbf':
+      position = 3
+    position = self._expect(position, b'{')
+    if self._peek(position) == b'}':
+      return
+    while True:
+      key, position = self._value(position)
+      position = self._expect(position, b':')
+      if key == 'features':
+        position = yield from self._features(position)
+      else:
+        self._members[key], position = self._value(position)
+      position = self._skip_whitespace(position)
+      character = self._peek(position)
+      position = self._expect(position, b',}')
+      if character == b'}':
+        return
+
+  def _features(self, position):
+    position = self._expect(position, b'[')
+    if self._peek(position) == b']':
+      return self._expect(position, b']')
+    chunk_end = position
+    while True:
+      if position >= chunk_end:
+        # the features up to a candidate separator are parsed at once as an array, if the candidate was not the end
+        # of a feature but inside one, the slice is not valid json and its features are parsed one by one instead
+        separator = self._FEATURES_SEPARATOR.search(self._data, position + self._chunk_size)
+        if separator is not None:
+          chunk_end = separator.start() + 1
+          try:
+            features = self._loads(b'[' + self._data[position:chunk_end] + b']')
+          except ValueError:
+            features = None
+          if features is not None:
+            yield from features
+            position = self._expect(chunk_end, b',')
+            continue
+      feature, position = self._value(position)
+      yield feature
+      position = self._skip_whitespace(position)
+      character = self._peek(position)
+      position = self._expect(position, b',]')
+      if character == b']':
+        return position
+
+  def _error(self, message, position):
+    return json.JSONDecodeError(f'{message} in geojson file {self._path}', '', position)
+
+  def _skip_whitespace(self, position):
+    return self._WHITESPACE.match(self._data, position).end()
+
+  def _peek(self, position):
+    return self._data[position:position + 1]
+
+  def _expect(self, position, characters):
+    position = self._skip_whitespace(position)
+    character = self._peek(position)
+    if character == b'' or character not in characters:
+      raise self._error(f'Expecting one of [{characters.decode()}]', position)
+    return position + 1
+
+  def _value(self, position):
+    """
+    Get the json value starting at the given position, parsing only its own bytes
+    :return: value, position after the value
+    """
+    position = self._skip_whitespace(position)
+    character = self._peek(position)
+    match = None
+    if character == b'{':
+      match = self._OBJECT.match(self._data, position)
+    if match is not None:
+      end = match.end()
+    elif character in self._NEXT_TOKEN:
+      end = self._container_end(position, character)
+    elif character == b'"':
+      match = self._STRING.match(self._data, position)
+      if match is None:
+        raise self._error('Unterminated string', position)
+      end = match.end()
+    else:
+      match = self._SCALAR.match(self._data, position)
+      if match is None:
+        raise self._error('Expecting value', position)
+      end = match.end()
+    return self._loads(self._data[position:end]), end
+
+  def _container_end(self, position, character):
+    next_token = self._NEXT_TOKEN[character]
+    depth = 0
+    while True:
+      token = next_token.match(self._data, position)
+      if token is None:
+        raise self._error('Unterminated value', position)
+      position = token.end()
+      if token.lastindex == 1:
+        depth += 1
+      else:
+        depth -= 1
+        if depth == 0:
+          return position
@@ -4,11 +4,15 @@ SPDX - License - Identifier: LGPL - 3.0 - or -later
 Copyright © 2022 Concordia CERC group
 Project Coder Pilar Monsalvete Alvarez de Uribarri pilar.monsalvete@concordia.ca
 """
+import glob
+import logging
 import math
 import sys
+from pathlib import Path
 
 import numpy as np
-from numpy import ndarray
+
+from helpers.utils import signed_area
 
 
 class GeometryHelper:
@@ -48,25 +52,24 @@ class GeometryHelper:
     return points
 
   @staticmethod
-  def remove_last_point_from_string(points) -> [ndarray]:
-    """
-    Return the point list without the last element
-    :return [ndarray]
-    """
-    array = points.split(' ')
-    res = " "
-    return res.join(array[0:len(array) - 3])
-
-  @staticmethod
-  def invert_points(points) -> [ndarray]:
+  def geojson_files(path) -> [Path]:
     """
-    Invert the point list
-    :return: [ndarray]
+    Get the geojson files in the given path, a file, a folder with geojson tiles, a glob pattern or a list of files
+    :return: [Path]
     """
-    res = []
-    for point in points:
-      res.insert(0, point)
-    return res
+    if isinstance(path, (list, tuple)):
+      files = [Path(file) for file in path]
+    elif Path(path).is_dir():
+      files = sorted(list(Path(path).glob('*.geojson')) + list(Path(path).glob('*.json')))
+    elif Path(path).exists():
+      files = [Path(path)]
+    else:
+      files = sorted(Path(file) for file in glob.glob(str(path)))
+    if len(files) == 0:
+      error_message = f'No geojson files found in [{path}]'
+      logging.error(error_message)
+      raise FileNotFoundError(error_message)
+    return files
 
   @staticmethod
   def ground_area(points):
@@ -74,31 +77,15 @@ class GeometryHelper:
     Get ground surface area in square meters
     :return: float
     """
-    # New method to calculate area
-
+    points = np.asarray(points)
     if len(points) < 3:
       sys.stderr.write('Warning: the area of a line or point cannot be calculated 1. Area = 0\n')
       return 0
-    alpha = 0
-    vec_1 = points[1] - points[0]
-    for i in range(2, len(points)):
-      vec_2 = points[i] - points[0]
-      alpha += GeometryHelper.angle_between_vectors(vec_1, vec_2)
-    if alpha == 0:
+    area = signed_area(points)
+    if area == 0:
       sys.stderr.write('Warning: the area of a line or point cannot be calculated 2. Area = 0\n')
       return 0
-    #
-    horizontal_points = points
-    area = 0
-    for i in range(0, len(horizontal_points) - 1):
-      point = horizontal_points[i]
-      next_point = horizontal_points[i + 1]
-      area += (next_point[1] + point[1]) / 2 * (next_point[0] - point[0])
-    next_point = horizontal_points[0]
-    point = horizontal_points[len(horizontal_points) - 1]
-    area += (next_point[1] + point[1]) / 2 * (next_point[0] - point[0])
-    _area = abs(area)
-    return _area
+    return abs(area)
 
   @staticmethod
   def angle_between_vectors(vec_1, vec_2):
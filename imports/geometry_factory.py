@@ -6,7 +6,9 @@ Project Coder Guille Gutierrez guillermo.gutierrezmorote@concordia.ca
 """
 
 from central_data_model.district import District
+from helpers.configuration_helper import ConfigurationHelper
 from helpers.utils import validate_import_export_type
+from imports.geometry.district_snapshot import DistrictSnapshot
 from imports.geometry.geojson import Geojson
 
 
@@ -19,7 +21,14 @@ class GeometryFactory:
                height_field=None,
                year_of_construction_field=None,
                function_field=None,
-               type_field=None):
+               type_field=None,
+               workers=None,
+               window=None,
+               window_crs=None,
+               clip_to_boundaries=False,
+               min_floor_area=None,
+               hub_crs=None,
+               cache_path=None):
     self._file_type = '_' + file_type.lower()
     validate_import_export_type(GeometryFactory, file_type)
     self._path = path
@@ -27,17 +36,34 @@ class GeometryFactory:
     self._year_of_construction_field = year_of_construction_field
     self._function_field = function_field
     self._type_field = type_field
+    self._workers = workers
+    self._window = window
+    self._window_crs = window_crs
+    self._clip_to_boundaries = clip_to_boundaries
+    self._min_floor_area = min_floor_area
+    self._hub_crs = hub_crs
+    self._cache_path = cache_path
 
-  def _geojson(self) -> District:
+  def _geojson(self, district=None) -> District:
     """
     Enrich the city by using Geojson information as data source
+    If a district is given, it is updated and only the changed features are imported again
     :return: City
     """
-    return Geojson(self._path,
-                   extrusion_height_field=self._height_field,
-                   year_of_construction_field=self._year_of_construction_field,
-                   function_field=self._function_field,
-                   type_of_feature_field=self._type_field).district
+    geojson = Geojson(self._path,
+                      extrusion_height_field=self._height_field,
+                      year_of_construction_field=self._year_of_construction_field,
+                      function_field=self._function_field,
+                      type_of_feature_field=self._type_field,
+                      workers=self._workers,
+                      window=self._window,
+                      window_crs=self._window_crs,
+                      clip_to_boundaries=self._clip_to_boundaries,
+                      min_floor_area=self._min_floor_area,
+                      hub_crs=self._hub_crs)
+    if district is None:
+      return geojson.district
+    return geojson.update_district(district)
 
   @property
   def district(self) -> District:
@@ -48,4 +74,39 @@ class GeometryFactory:
     _handlers = {
       '_geojson': self._geojson
     }
-    return _handlers[self._file_type]()
+    if self._cache_path is None:
+      return _handlers[self._file_type]()
+    min_floor_area = self._min_floor_area
+    if min_floor_area is None:
+      min_floor_area = ConfigurationHelper().min_building_floor_area
+    # the import parameters that change the resulting district
+    parameters = {
+      'file_type': self._file_type,
+      'height_field': self._height_field,
+      'year_of_construction_field': self._year_of_construction_field,
+      'function_field': self._function_field,
+      'type_field': self._type_field,
+      'window': self._window,
+      'window_crs': self._window_crs,
+      'clip_to_boundaries': self._clip_to_boundaries,
+      'min_floor_area': min_floor_area,
+      'hub_crs': self._hub_crs
+    }
+    snapshot = DistrictSnapshot(self._cache_path, self._path, parameters)
+    district = snapshot.load()
+    if district is None:
+      district = _handlers[self._file_type]()
+      snapshot.save(district)
+    return district
+
+  def update_district(self, district) -> District:
+    """
+    Update a district imported with the same parameters to the content of the given file,
+    keeping the buildings whose source features did not change
+    :param district: District
+    :return: District
+    """
+    _handlers = {
+      '_geojson': self._geojson
+    }
+    return _handlers[self._file_type](district)
@@ -0,0 +1,49 @@
+"""
+TestConfigurationHelper
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+from helpers.configuration_helper import ConfigurationHelper
+
+
+class TestConfigurationHelper(TestCase):
+  """
+  Configuration helper tests
+  """
+
+  def test_cached_configuration(self):
+    """
+    The configuration file is read once and shared, until it is reloaded from another file
+    """
+    self.addCleanup(ConfigurationHelper.reload)
+    ConfigurationHelper.reload()
+    with mock.patch('configparser.ConfigParser.read') as read:
+      configuration = ConfigurationHelper()
+      self.assertEqual(25, configuration.min_building_floor_area)
+      self.assertIsInstance(configuration.soil_thickness, float)
+      self.assertEqual(10, ConfigurationHelper().cold_water_temperature)
+      read.assert_not_called()
+    with self.assertRaises(TypeError):
+      configuration._values['soil_thickness'] = 1  # pylint: disable=protected-access
+    with tempfile.TemporaryDirectory() as folder:
+      path = Path(folder) / 'configuration.ini'
+      with open(ConfigurationHelper.path(), 'r', encoding='utf8') as default_file:
+        default = default_file.read()
+      with open(path, 'w', encoding='utf8') as configuration_file:
+        configuration_file.write(default.replace('min_building_floor_area = 25', 'min_building_floor_area = 40'))
+      ConfigurationHelper.reload(path)
+      self.assertEqual(40, ConfigurationHelper().min_building_floor_area)
+      # the instances created before keep their values
+      self.assertEqual(25, configuration.min_building_floor_area)
+      ConfigurationHelper.reload()
+      self.assertEqual(25, ConfigurationHelper().min_building_floor_area)
+      with mock.patch.dict(os.environ, {'HIPATIA_CONFIGURATION': str(path)}):
+        ConfigurationHelper.reload()
+        self.assertEqual(40, ConfigurationHelper().min_building_floor_area)
+    with self.assertRaises(FileNotFoundError):
+      ConfigurationHelper.reload(Path(folder) / 'configuration.ini')
@@ -0,0 +1,84 @@
+"""
+TestDistrictSnapshot
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from imports.geometry_factory import GeometryFactory
+
+
+class TestDistrictSnapshot(TestCase):
+  """
+  District snapshot cache tests
+  """
+
+  def setUp(self) -> None:
+    """
+    Test setup
+    :return: None
+    """
+    self._example_path = (Path(__file__).parent / 'data').resolve()
+    self._cache = tempfile.TemporaryDirectory()
+    self._cache_path = Path(self._cache.name)
+
+  def tearDown(self) -> None:
+    """
+    Remove the cache
+    :return: None
+    """
+    self._cache.cleanup()
+
+  def _district(self, height_field='height'):
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    return GeometryFactory('geojson',
+                           path=file,
+                           height_field=height_field,
+                           year_of_construction_field='yoc',
+                           type_field='feature_type',
+                           cache_path=self._cache_path).district
+
+  def test_snapshot(self):
+    """
+    The district loaded from the snapshot is the same as the imported one
+    """
+    imported = self._district()
+    self.assertEqual(1, len(list(self._cache_path.iterdir())))
+    cached = self._district()
+    self.assertEqual([building.name for building in imported.buildings],
+                     [building.name for building in cached.buildings])
+    for imported_building, cached_building in zip(imported.buildings, cached.buildings):
+      self.assertAlmostEqual(imported_building.floor_area, cached_building.floor_area)
+      self.assertAlmostEqual(imported_building.volume, cached_building.volume)
+      self.assertEqual(imported_building.year_of_construction, cached_building.year_of_construction)
+      self.assertEqual([surface.type for surface in imported_building.surfaces],
+                       [surface.type for surface in cached_building.surfaces])
+    self.assertAlmostEqual(imported.area, cached.area)
+    # a different field mapping is a different snapshot
+    self._district(height_field=None)
+    self.assertEqual(2, len(list(self._cache_path.iterdir())))
+
+  def test_snapshot_geometry(self):
+    """
+    The buildings loaded from the snapshot keep their prism, storeys and surfaces metadata, so their geometry is the
+    same as the imported one without building the polyhedron
+    """
+    for height_field in ['height', None]:
+      imported = self._district(height_field=height_field)
+      cached = self._district(height_field=height_field)
+      for imported_building, cached_building in zip(imported.buildings, cached.buildings):
+        self.assertEqual(imported_building.prism is None, cached_building.prism is None)
+        self.assertEqual(imported_building.storeys_above_ground, cached_building.storeys_above_ground)
+        if imported_building.prism is not None:
+          self.assertEqual(imported_building.volume, cached_building.volume)
+          self.assertEqual(imported_building.centroid, cached_building.centroid)
+        self.assertEqual(imported_building.max_height, cached_building.max_height)
+        self.assertEqual(imported_building.lower_corner, cached_building.lower_corner)
+        for imported_surface, cached_surface in zip(imported_building.surfaces, cached_building.surfaces):
+          self.assertAlmostEqual(imported_surface.azimuth, cached_surface.azimuth)
+          self.assertAlmostEqual(imported_surface.zenith_angle, cached_surface.zenith_angle)
+          self.assertEqual(imported_surface.lower_corner, cached_surface.lower_corner)
+          self.assertEqual(imported_surface.upper_corner, cached_surface.upper_corner)
+          self.assertEqual(imported_surface.perimeter_polygon.area, cached_surface.perimeter_polygon.area)
@@ -0,0 +1,296 @@
+"""
+TestGeojson
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import copy
+import itertools
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+import numpy as np
+
+from helpers.attributes.polygon import Polygon
+from helpers.utils import signed_area
+from imports.geometry.geojson import Geojson
+from imports.geometry.geojson_classes.geojson_lod0 import GeoJsonLOD0
+from imports.geometry.helpers.geojson_feature_reader import GeojsonFeatureReader, JSON_BACKENDS
+
+
+class TestGeojson(TestCase):
+  """
+  Geojson importer tests
+  """
+
+  def setUp(self) -> None:
+    """
+    Test setup
+    :return: None
+    """
+    self._example_path = (Path(__file__).parent / 'data').resolve()
+
+  def test_feature_reader(self):
+    """
+    The features read one by one are the same ones loaded at once, whatever the json backend and chunk size
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    with open(file, 'r', encoding='utf8') as json_file:
+      geojson = json.load(json_file)
+    tricky = {'type': 'FeatureCollection',
+              'name': 'quotes \\" and braces {[',
+              'features': [{'type': 'Feature', 'properties': {'name': '}, {"]\\', 'height': 1e-3}, 'geometry': None},
+                           {'type': 'Feature', 'properties': {'parts': [{}, {'a': {}}]}, 'geometry': None}],
+              'bbox': [-1, 0.5, 2, 3]}
+    for backend, chunk_size in itertools.product(JSON_BACKENDS, [1, 1000, None]):
+      reader = GeojsonFeatureReader(file, json_backend=backend, chunk_size=chunk_size)
+      self.assertEqual(geojson['features'], list(reader))
+      self.assertEqual('FeatureCollection', reader.members['type'])
+      with tempfile.TemporaryDirectory() as folder:
+        tricky_file = Path(folder) / 'tricky.geojson'
+        with open(tricky_file, 'w', encoding='utf8') as json_file:
+          json.dump(tricky, json_file, indent=2)
+        reader = GeojsonFeatureReader(tricky_file, json_backend=backend, chunk_size=chunk_size)
+        self.assertEqual(tricky['features'], list(reader))
+        self.assertEqual(tricky['bbox'], reader.members['bbox'])
+        self.assertEqual(tricky['name'], reader.members['name'])
+    with self.assertRaises(ValueError):
+      GeojsonFeatureReader(file, json_backend='unknown')
+
+  def test_iter_buildings(self):
+    """
+    Iterating the buildings gives the same buildings as the district
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    geojson = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type')
+    names = [building.name for building in geojson.iter_buildings()]
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type').district
+    self.assertEqual(names, [building.name for building in district.buildings])
+    self.assertIsNotNone(district.polygon)
+
+  def test_parallel_district(self):
+    """
+    Parsing the features in a process pool gives the same district as the sequential parsing
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    sequential = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type').district
+    parallel = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type', workers=2).district
+    self.assertEqual([building.name for building in sequential.buildings],
+                     [building.name for building in parallel.buildings])
+    for sequential_building, parallel_building in zip(sequential.buildings, parallel.buildings):
+      self.assertAlmostEqual(sequential_building.floor_area, parallel_building.floor_area)
+      self.assertAlmostEqual(sequential_building.volume, parallel_building.volume)
+    self.assertAlmostEqual(sequential.area, parallel.area)
+
+  def test_window(self):
+    """
+    Only the buildings intersecting the query window are imported
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    window = [374480.491975, 218839.658365, 374680.491975, 219099.658365]
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                       window=window, window_crs='epsg:2062').district
+    self.assertEqual(['0', '4'], [building.name for building in district.buildings])
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                       window=[-6.2027, 36.5373, -6.2010, 36.5378]).district
+    self.assertEqual(['0'], [building.name for building in district.buildings])
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                       clip_to_boundaries=True).district
+    self.assertEqual(5, len(district.buildings))
+
+  def test_repeated_boundaries(self):
+    """
+    Only the first district boundaries are kept and the repeated ones are reported, sequentially and when merging
+    the tiles parsed in parallel
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    with open(file, 'r', encoding='utf8') as json_file:
+      features = json.load(json_file)['features']
+    with tempfile.TemporaryDirectory() as folder:
+      for i, tile in enumerate([features, features[3:]]):
+        with open(Path(folder) / f'tile_{i}.geojson', 'w', encoding='utf8') as json_file:
+          json.dump({'type': 'FeatureCollection', 'features': tile}, json_file)
+      repeated_file = Path(folder) / 'repeated.geojson'
+      with open(repeated_file, 'w', encoding='utf8') as json_file:
+        json.dump({'type': 'FeatureCollection', 'features': features + features[-1:]}, json_file)
+      for path, workers in [(repeated_file, None), (f'{folder}/tile_*.geojson', 2)]:
+        with self.assertLogs(level='WARNING') as logs:
+          district = Geojson(path, extrusion_height_field='height', type_of_feature_field='feature_type',
+                             workers=workers).district
+        self.assertIn('More than one polygon defining the district', logs.output[0])
+        self.assertEqual(5, len(district.buildings))
+        self.assertIsNotNone(district.polygon)
+
+  def test_min_floor_area(self):
+    """
+    The buildings with a footprint smaller than the minimum floor area are not imported
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                       min_floor_area=4000).district
+    self.assertEqual(['2', '3'], [building.name for building in district.buildings])
+    for building in district.buildings:
+      self.assertGreaterEqual(building.floor_area, 4000)
+
+  def test_update_district(self):
+    """
+    Updating a district only replaces the buildings whose feature changed
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    with open(file, 'r', encoding='utf8') as json_file:
+      geojson = json.load(json_file)
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type').district
+    buildings = {building.name: building for building in district.buildings}
+    features = geojson['features']
+    # a building added by hand has no fingerprint and is not touched by the updates
+    manual_feature = copy.deepcopy(features[2])
+    manual_feature['id'] = 'manual'
+    with tempfile.TemporaryDirectory() as folder:
+      manual_file = Path(folder) / 'manual.geojson'
+      with open(manual_file, 'w', encoding='utf8') as json_file:
+        json.dump({'type': 'FeatureCollection', 'features': [manual_feature]}, json_file)
+      manual_building = Geojson(manual_file, extrusion_height_field='height',
+                                type_of_feature_field='feature_type').district.building('manual')
+    manual_building.fingerprint = None
+    district.add_building(manual_building)
+    features[1]['properties']['height'] = 30
+    new_feature = copy.deepcopy(features[3])
+    new_feature['id'] = 5
+    del features[2]
+    features.append(new_feature)
+    with tempfile.TemporaryDirectory() as folder:
+      updated_file = Path(folder) / 'buildings.geojson'
+      with open(updated_file, 'w', encoding='utf8') as json_file:
+        json.dump(geojson, json_file)
+      updated = Geojson(updated_file, extrusion_height_field='height', type_of_feature_field='feature_type')
+      self.assertIs(district, updated.update_district(district))
+    self.assertEqual(['0', '3', '4', 'manual', '1', '5'], [building.name for building in district.buildings])
+    self.assertIs(manual_building, district.building('manual'))
+    for name in ['0', '3', '4']:
+      self.assertIs(buildings[name], district.building(name))
+    self.assertIsNot(buildings['1'], district.building('1'))
+    self.assertAlmostEqual(30, district.building('1').max_height)
+    self.assertIsNone(district.building('2'))
+    self.assertIsNotNone(district.polygon)
+
+  def test_tiles(self):
+    """
+    The tiles in a folder are merged into the same district as the whole file, without repeated buildings
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    with open(file, 'r', encoding='utf8') as json_file:
+      geojson = json.load(json_file)
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type').district
+    features = geojson['features']
+    tiles = [features[0:2], features[1:4], features[4:]]
+    with tempfile.TemporaryDirectory() as folder:
+      for i, tile in enumerate(tiles):
+        with open(Path(folder) / f'tile_{i}.geojson', 'w', encoding='utf8') as json_file:
+          json.dump({'type': 'FeatureCollection', 'features': tile}, json_file)
+      for path, workers in [(folder, None), (f'{folder}/tile_*.geojson', None), (folder, 2)]:
+        tiled = Geojson(path, extrusion_height_field='height', type_of_feature_field='feature_type',
+                        workers=workers).district
+        self.assertEqual([building.name for building in district.buildings],
+                         [building.name for building in tiled.buildings])
+        for building, tiled_building in zip(district.buildings, tiled.buildings):
+          self.assertAlmostEqual(building.volume, tiled_building.volume)
+        self.assertAlmostEqual(district.area, tiled.area)
+    with self.assertRaises(FileNotFoundError):
+      Geojson(self._example_path / 'missing_*.geojson')
+
+  def test_holes(self):
+    """
+    The holes are bridged into a single ground ring, the same with the distances matrix and the tree
+    """
+    def ring(x, y, size, counterclockwise=True):
+      angles = np.linspace(0, 2 * np.pi, 65)
+      if not counterclockwise:
+        angles = angles[::-1]
+      return np.column_stack((x + size * np.cos(angles), y + size * np.sin(angles), np.zeros(65)))
+
+    geometry = {'type': 'Polygon',
+                'coordinates': [ring(0, 0, 50), ring(-20, 0, 10, False), ring(20, 0, 10, False)]}
+    grounds = []
+    for matrix_size in [GeoJsonLOD0._MAX_DISTANCE_MATRIX_SIZE, 0]:
+      with mock.patch.object(GeoJsonLOD0, '_MAX_DISTANCE_MATRIX_SIZE', matrix_size):
+        building = GeoJsonLOD0(None, None).parse(geometry, 'courtyards', [], None, None, None)
+      self.assertEqual(1, len(building.grounds))
+      grounds.append(building.grounds[0].perimeter_polygon)
+    np.testing.assert_array_equal(grounds[0].coordinates, grounds[1].coordinates)
+    self.assertEqual(3 * 64 + 4, len(grounds[0].coordinates))
+    expected_area = signed_area(geometry['coordinates'][0]) + 2 * signed_area(geometry['coordinates'][1])
+    self.assertAlmostEqual(expected_area, grounds[0].area)
+
+  def test_storeys(self):
+    """
+    The buildings are extruded storey by storey up to their height
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    with open(file, 'r', encoding='utf8') as json_file:
+      geojson = json.load(json_file)
+    for feature in geojson['features']:
+      feature['properties']['storey_height'] = 5
+    with tempfile.TemporaryDirectory() as folder:
+      storeys_file = Path(folder) / 'buildings.geojson'
+      with open(storeys_file, 'w', encoding='utf8') as json_file:
+        json.dump(geojson, json_file)
+      district = Geojson(storeys_file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                         storey_height_field='storey_height', min_floor_area=0).district
+    building = district.building('1')
+    footprint_area = building.grounds[0].perimeter_polygon.area
+    self.assertEqual(3, building.storeys_above_ground)
+    self.assertEqual(3, len(building.grounds))
+    self.assertEqual(3, len(building.roofs))
+    self.assertEqual(3 * len(building.grounds[0].perimeter_polygon.coordinates), len(building.walls))
+    self.assertAlmostEqual(15, building.upper_corner[2])
+    self.assertAlmostEqual(footprint_area * 15, building.volume)
+    self.assertEqual([0, 5, 10], sorted(ground.lower_corner[2] for ground in building.grounds))
+    # the eave is at the top of the last storey walls
+    self.assertAlmostEqual(15, building.eave_height)
+    # the prism and the surfaces give the same bounds
+    self.assertEqual(building.lower_corner, building.simplified_polyhedron.bounding_box.lower_corner)
+    self.assertEqual(building.upper_corner, building.simplified_polyhedron.bounding_box.upper_corner)
+    self.assertAlmostEqual(15, building.simplified_polyhedron.max_z)
+
+  def test_surfaces_metadata(self):
+    """
+    The extruded surfaces come with their normal, area and type, the same ones calculated from their coordinates,
+    without triangulating them
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type').district
+    with mock.patch.object(Polygon, 'triangles', new_callable=mock.PropertyMock) as triangles:
+      triangles.side_effect = AssertionError('triangulated')
+      for building in district.buildings:
+        self.assertGreater(building.floor_area, 0)
+        for surface in building.surfaces:
+          polygon = surface.perimeter_polygon
+          coordinates = np.asarray(polygon.coordinates)
+          newell = np.cross(coordinates, np.roll(coordinates, -1, axis=0)).sum(axis=0)
+          self.assertAlmostEqual(np.linalg.norm(newell) / 2, polygon.area)
+          np.testing.assert_allclose(newell / np.linalg.norm(newell), polygon.normal, atol=1e-9)
+          self.assertAlmostEqual(np.arccos(polygon.normal[2]), surface.zenith_angle)
+          np.testing.assert_array_equal(coordinates.min(axis=0), surface.lower_corner)
+          np.testing.assert_array_equal(coordinates.max(axis=0), surface.upper_corner)
+        self.assertEqual(len(building.grounds[0].perimeter_polygon.coordinates), len(building.walls))
+
+  def test_read_only_surfaces(self):
+    """
+    The extruded surfaces share their coordinates, so they cannot be modified through one of them
+    """
+    file = Path(self._example_path / 'buildings.geojson').resolve()
+    with open(file, 'r', encoding='utf8') as json_file:
+      geojson = json.load(json_file)
+    for feature in geojson['features']:
+      feature['properties']['storey_height'] = 5
+    with tempfile.TemporaryDirectory() as folder:
+      storeys_file = Path(folder) / 'buildings.geojson'
+      with open(storeys_file, 'w', encoding='utf8') as json_file:
+        json.dump(geojson, json_file)
+      district = Geojson(storeys_file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                         storey_height_field='storey_height', min_floor_area=0).district
+    for building in district.buildings:
+      for surface in building.surfaces:
+        with self.assertRaises(ValueError):
+          surface.perimeter_polygon.coordinates[0, 2] = 99
@@ -0,0 +1,191 @@
+"""
+TestGeometryHelper
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+import json
+import math
+import tempfile
+from pathlib import Path
+from unittest import TestCase, mock
+
+import numpy as np
+
+from central_data_model.building import Building
+from central_data_model.building_demand.surface import Surface
+import helpers.constants as cte
+from helpers.adjacency_helper import AdjacencyHelper
+from helpers.attributes.polygon import Polygon
+from helpers.geometry_helper import GeometryHelper
+from imports.geometry.geojson import Geojson
+from imports.geometry.geojson_classes.geojson_lod0 import GeoJsonLOD0
+
+
+class TestGeometryHelper(TestCase):
+  """
+  Geometry helper tests
+  """
+
+  @staticmethod
+  def _terraced_district():
+    # row houses in meters around Cadiz, the last one stands alone
+    footprints = [(0, 0, 6, 10), (6, 0, 12, 12), (12, 0, 17, 8), (40, 0, 46, 10)]
+    longitude, latitude = -6.29, 36.52
+    x_factor = 1 / (111320 * math.cos(math.radians(latitude)))
+    y_factor = 1 / 110540
+    features = []
+    for i, (x_min, y_min, x_max, y_max) in enumerate(footprints):
+      ring = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max], [x_min, y_min]]
+      ring = [[longitude + x * x_factor, latitude + y * y_factor] for x, y in ring]
+      features.append({'type': 'Feature', 'id': i, 'properties': {'height': 6 + 3 * i, 'feature_type': 'building'},
+                       'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    with tempfile.TemporaryDirectory() as folder:
+      file = Path(folder) / 'terraced.geojson'
+      with open(file, 'w', encoding='utf8') as json_file:
+        json.dump({'type': 'FeatureCollection', 'features': features}, json_file)
+      return Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type',
+                     min_floor_area=0).district
+
+  def test_city_mapping(self):
+    """
+    The shared footprint segments are found with their length, keyed as in the minimap
+    """
+    district = self._terraced_district()
+    lines_information = GeometryHelper.city_mapping(district)
+    self.assertEqual(['0', '1', '2'], sorted(lines_information.keys()))
+    shared_lengths = {}
+    for name, entries in lines_information.items():
+      for entry in entries.values():
+        shared_lengths[(name, entry['neighbour_name'])] = entry['shared_length']
+        self.assertEqual(int(entry['shared_length'] * GeometryHelper.factor() * 2), entry['shared_points'])
+    self.assertEqual({('0', '1'), ('1', '0'), ('1', '2'), ('2', '1')}, set(shared_lengths.keys()))
+    self.assertAlmostEqual(10, shared_lengths[('0', '1')], delta=0.1)
+    self.assertAlmostEqual(8, shared_lengths[('2', '1')], delta=0.1)
+    self.assertEqual(['1'], [neighbour.name for neighbour in district.building('0').neighbours])
+    self.assertEqual(['0', '2'], sorted(neighbour.name for neighbour in district.building('1').neighbours))
+    self.assertIsNone(district.building('3').neighbours)
+    # the raster minimap finds the same shared lines
+    raster_information = GeometryHelper.city_mapping(self._terraced_district(), method='raster')
+    for name, entries in lines_information.items():
+      raster_keys = {key for key, entry in raster_information[name].items() if entry['shared_points'] > 2}
+      self.assertEqual(raster_keys, set(entries.keys()))
+    with self.assertRaises(ValueError):
+      GeometryHelper.city_mapping(district, method='unknown')
+
+  def test_sparse_raster(self):
+    """
+    The raster minimap only stores the touched cells and only draws the image when it is plotted
+    """
+    district = self._terraced_district()
+    with mock.patch('PIL.Image.new') as new_image:
+      lines_information = GeometryHelper.city_mapping(district, method='raster')
+      new_image.assert_not_called()
+      self.assertEqual(['0', '1', '2'], sorted(lines_information.keys()))
+      GeometryHelper.city_mapping(self._terraced_district(), method='raster', plot=True)
+      new_image.assert_called_once()
+      new_image.return_value.show.assert_called_once()
+
+  def test_parallel_city_mapping(self):
+    """
+    The tiles mapped in parallel give the same shared lines and neighbours as the whole district
+    """
+    district = self._terraced_district()
+    lines_information = GeometryHelper.city_mapping(district)
+    with mock.patch.object(AdjacencyHelper, 'TILE_SIZE', 5):
+      parallel_district = self._terraced_district()
+      self.assertEqual(lines_information, GeometryHelper.city_mapping(parallel_district, workers=2))
+    for building, parallel_building in zip(district.buildings, parallel_district.buildings):
+      self.assertEqual([neighbour.name for neighbour in building.neighbours or []],
+                       [neighbour.name for neighbour in parallel_building.neighbours or []])
+
+  def test_adjacency_graph(self):
+    """
+    The district adjacency graph gives the buildings neighbours, shared lengths and blocks
+    """
+    district = self._terraced_district()
+    graph = district.adjacency_graph
+    self.assertEqual([1, 2, 1, 0], graph.degree.tolist())
+    self.assertEqual([0, 0, 0, 1], graph.connected_blocks.tolist())
+    self.assertEqual([0, 2], graph.neighbours(1).tolist())
+    np.testing.assert_allclose([10, 8], graph.neighbour_lengths(1), atol=0.1)
+    starts, ends = graph.shared_segments(2, 1)
+    self.assertEqual(1, len(starts))
+    self.assertAlmostEqual(8, np.linalg.norm(ends[0] - starts[0]), delta=0.1)
+    self.assertEqual(0, len(graph.shared_segments(0, 2)[0]))
+    # the buildings neighbours are read from the graph until they are set
+    self.assertEqual(['0', '2'], [neighbour.name for neighbour in district.building('1').neighbours])
+    self.assertIsNone(district.building('3').neighbours)
+    district.building('3').neighbours = [district.building('0')]
+    self.assertEqual(['0'], [neighbour.name for neighbour in district.building('3').neighbours])
+    # the neighbours list is kept, so it can be changed in place
+    district.building('2').neighbours.append(district.building('3'))
+    self.assertEqual(['1', '3'], [neighbour.name for neighbour in district.building('2').neighbours])
+    # the removed building is not a neighbour anymore and the other buildings keep their neighbours
+    removed = district.building('0')
+    district.remove_building(removed)
+    self.assertEqual(4, len(graph.nodes))
+    self.assertIsNone(removed.neighbours)
+    self.assertEqual(['2'], [neighbour.name for neighbour in district.building('1').neighbours])
+    self.assertEqual(['1'], [neighbour.name for neighbour in district.building('2').neighbours])
+    self.assertEqual(['0'], [neighbour.name for neighbour in district.building('3').neighbours])
+    self.assertEqual([1, 1, 0], district.adjacency_graph.degree.tolist())
+    starts, ends = district.adjacency_graph.shared_segments(1, 0)
+    self.assertAlmostEqual(8, np.linalg.norm(ends[0] - starts[0]), delta=0.1)
+    # the added building walls are unknown, so the graph is calculated again when the neighbours are read
+    district.add_building(removed)
+    with mock.patch.object(AdjacencyHelper, 'adjacency_graph', wraps=AdjacencyHelper.adjacency_graph) as calculate:
+      self.assertEqual(['2', '0'], [neighbour.name for neighbour in district.building('1').neighbours])
+      self.assertEqual(['1'], [neighbour.name for neighbour in removed.neighbours])
+      self.assertEqual(['0'], [neighbour.name for neighbour in district.building('3').neighbours])
+      calculate.assert_called_once()
+    self.assertEqual([2, 1, 0, 1], district.adjacency_graph.degree.tolist())
+    GeometryHelper.city_mapping(district)
+    self.assertEqual([2, 1, 0, 1], district.adjacency_graph.degree.tolist())
+
+  def test_shared_percentage_to_walls(self):
+    """
+    The walls store the fraction of their surface shared with the neighbours, limited by the neighbour height
+    """
+    for method in ['segments', 'raster']:
+      district = self._terraced_district()
+      GeoJsonLOD0(None, None).store_shared_percentage_to_walls(district, GeometryHelper.city_mapping(district,
+                                                                                                     method=method))
+      percentages = {}
+      for building in district.buildings:
+        percentages[building.name] = sorted(wall.percentage_shared for wall in building.walls)
+      np.testing.assert_allclose([0, 0, 0, 1], percentages['0'], atol=1e-2)
+      np.testing.assert_allclose([0, 0, 10 / 12 * 6 / 9, 8 / 12], percentages['1'], atol=1e-2)
+      np.testing.assert_allclose([0, 0, 0, 9 / 12], percentages['2'], atol=1e-2)
+      self.assertEqual([0, 0, 0, 0], percentages['3'])
+
+  def test_degenerated_shared_lines(self):
+    """
+    The lines without length, or of a building without height, add nothing to the walls percentage
+    """
+    district = self._terraced_district()
+    city_mapped = GeometryHelper.city_mapping(district)
+    store = GeoJsonLOD0(None, None).store_shared_percentage_to_walls
+    store(district, city_mapped)
+    expected = {building.name: [wall.percentage_shared for wall in building.walls] for building in district.buildings}
+    # a wall without width at the first corner of the building 0, matching a line without length
+    point = np.asarray(district.building('0').walls[0].perimeter_polygon.coordinates[0])
+    coordinates = np.array([point, point, point + [0, 0, 6], point + [0, 0, 6]])
+    wall = Surface(Polygon(coordinates), Polygon(coordinates), surface_type=cte.WALL)
+    wall.percentage_shared = 0.5
+    district.building('0').walls.append(wall)
+    city_mapped['0']['degenerated'] = {'line_start': point, 'line_end': point, 'neighbour_line_start': point,
+                                       'neighbour_line_end': point, 'neighbour_name': '1', 'shared_points': 3}
+    store(district, city_mapped)
+    expected['0'].append(0)
+    for building in district.buildings:
+      self.assertEqual(expected[building.name], [wall.percentage_shared for wall in building.walls])
+    # the building 2 has no height, so it shares nothing with the building 1 and the building 1 nothing with it
+    for wall in district.building('2').walls:
+      wall.percentage_shared = 0.5
+    max_height = Building.max_height
+    with mock.patch.object(Building, 'max_height',
+                           property(lambda building: 0 if building.name == '2' else max_height.fget(building))):
+      store(district, city_mapped)
+    self.assertEqual([0] * 4, [wall.percentage_shared for wall in district.building('2').walls])
+    np.testing.assert_allclose([0, 0, 0, 10 / 12 * 6 / 9], sorted(wall.percentage_shared
+                                                                 for wall in district.building('1').walls), atol=1e-2)
@@ -0,0 +1,129 @@
+"""
+TestPolygon
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from helpers.attributes.polygon import Polygon
+from helpers.attributes.polyhedron import Polyhedron
+from helpers.triangulation_helper import TriangulationHelper
+
+
+class TestPolygon(TestCase):
+  """
+  Polygon geometry tests
+  """
+
+  def test_newell_normal_and_area(self):
+    """
+    The normal and area of planar polygons are given by their Newell vector
+    """
+    # concave ground ring far from the origin, clockwise seen from above so it faces down
+    ground = np.array([[0, 0, 0], [0, 20, 0], [10, 20, 0], [10, 10, 0], [30, 10, 0], [30, 0, 0]], dtype=float)
+    ground += [500000, 4000000, 12]
+    polygon = Polygon(ground)
+    self.assertTrue(polygon.is_planar)
+    np.testing.assert_allclose(polygon.normal, [0, 0, -1], atol=1e-12)
+    self.assertAlmostEqual(polygon.area, 400)
+    # tilted roof, the normal follows the right hand rule
+    roof = np.array([[0, 0, 0], [4, 0, 0], [4, 3, 4], [0, 3, 4]], dtype=float)
+    polygon = Polygon(roof)
+    self.assertTrue(polygon.is_planar)
+    np.testing.assert_allclose(polygon.normal, [0, -0.8, 0.6])
+    self.assertAlmostEqual(polygon.area, 20)
+    # degenerated polygons have no normal
+    polygon = Polygon(np.array([[0, 0, 0], [1, 1, 1], [2, 2, 2]], dtype=float))
+    np.testing.assert_array_equal(polygon.normal, [0, 0, 0])
+    self.assertEqual(polygon.area, 0)
+
+  def test_non_planar(self):
+    """
+    Non-planar polygons are detected so their area is triangulated instead
+    """
+    polygon = Polygon(np.array([[0, 0, 0], [10, 0, 1], [10, 10, 0], [0, 10, 1]], dtype=float))
+    self.assertFalse(polygon.is_planar)
+    polygon = Polygon(np.array([[0, 0, 0], [10, 0, 0.0001], [10, 10, 0], [0, 10, 0.0001]], dtype=float))
+    self.assertTrue(polygon.is_planar)
+
+  def test_triangulation(self):
+    """
+    The simple polygons are triangulated without the external engine, the triangles oriented as the polygon
+    """
+    wall = np.array([[0, 0, 0], [4, 0, 0], [4, 0, 3], [0, 0, 3]], dtype=float) + [500000, 4000000, 0]
+    ground = np.array([[0, 0, 0], [0, 20, 0], [10, 20, 0], [10, 10, 0], [30, 10, 0], [30, 0, 0]], dtype=float)
+    # comb shaped roof, so several ears are clipped at once
+    roof = np.array([[0, 0, 5], [9, 0, 5], [9, 5, 5], [8, 5, 5], [8, 1, 5], [6, 1, 5], [6, 5, 5], [5, 5, 5],
+                     [5, 1, 5], [3, 1, 5], [3, 5, 5], [2, 5, 5], [2, 1, 5], [0, 1, 5]], dtype=float)
+    for coordinates, triangles in [(wall, 2), (ground, 4), (roof, 12), (roof[::-1], 12)]:
+      polygon = Polygon(coordinates)
+      faces = TriangulationHelper.triangulate(coordinates, polygon.normal)
+      self.assertEqual(len(faces), triangles)
+      self.assertEqual(len(polygon.triangles), triangles)
+      area = 0
+      for triangle in polygon.triangles:
+        np.testing.assert_allclose(triangle.normal, polygon.normal, atol=1e-9)
+        area += triangle.area
+      self.assertAlmostEqual(area, polygon.area)
+    # the triangles follow the given normal even if the polygon turns the other way
+    faces = TriangulationHelper.triangulate(ground, [0, 0, 1])
+    self.assertAlmostEqual(Polygon(ground[faces[0]]).normal[2], 1)
+    # the holes bridged into the ring repeat vertices and are left to the external engine
+    bridged = np.concatenate((ground[:1], [[2, 2, 0], [6, 2, 0], [6, 6, 0], [2, 6, 0], [2, 2, 0]], ground))
+    self.assertIsNone(TriangulationHelper.triangulate(bridged, [0, 0, -1]))
+
+  def test_triangulation_cache(self):
+    """
+    The congruent polygons reuse the cached triangulation, the least recently used ones are evicted
+    """
+    self.addCleanup(TriangulationHelper.set_cache_size, TriangulationHelper.cache_info()['max_size'])
+    TriangulationHelper.clear_cache()
+    wall = np.array([[0, 0, 0], [4, 0, 0], [4, 0, 3], [0, 0, 3]], dtype=float)
+    faces = TriangulationHelper.triangulate(wall, [0, -1, 0])
+    # same wall in another storey and another building facing the same direction
+    self.assertIs(TriangulationHelper.triangulate(wall + [100, 50, 3], [0, -1, 0]), faces)
+    self.assertFalse(faces.flags.writeable)
+    info = TriangulationHelper.cache_info()
+    self.assertEqual((info['hits'], info['misses'], info['size']), (1, 1, 1))
+    # the fallback triangulation is cached as well
+    calls = []
+
+    def fallback(vertices, normal):
+      calls.append(vertices)
+      return [[0, 1, 2]]
+
+    bridged = np.array([[0, 0, 0], [0, 10, 0], [10, 10, 0], [10, 0, 0], [0, 0, 0], [2, 2, 0], [2, 6, 0]], dtype=float)
+    for translation in [0, 100]:
+      np.testing.assert_array_equal(TriangulationHelper.triangulate(bridged + translation, [0, 0, -1], fallback),
+                                    [[0, 1, 2]])
+    self.assertEqual(len(calls), 1)
+    TriangulationHelper.set_cache_size(1)
+    self.assertEqual(TriangulationHelper.cache_info()['size'], 1)
+    TriangulationHelper.triangulate(wall, [0, -1, 0])
+    TriangulationHelper.triangulate(bridged, [0, 0, -1], fallback)
+    self.assertEqual(len(calls), 2)
+    info = TriangulationHelper.cache_info()
+    self.assertEqual((info['hits'], info['misses'], info['size']), (2, 4, 1))
+
+  def test_vertex_welding(self):
+    """
+    The polygons vertices shared by several faces are welded into a single vertex
+    """
+    corners = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]],
+                       dtype=float)
+    # unit cube quads facing out, the -0.0 coordinates are the same vertices as the 0.0 ones
+    quads = [[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4], [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]]
+    signed_corners = np.where(corners == 0, -0.0, corners)
+    polygons = [Polygon(signed_corners[quad] if i % 2 else corners[quad]) for i, quad in enumerate(quads)]
+    polyhedron = Polyhedron(polygons)
+    np.testing.assert_array_equal(polyhedron.vertices, corners[[0, 3, 2, 1, 4, 5, 6, 7]])
+    self.assertEqual(len(polyhedron.faces), 12)
+    self.assertEqual(polyhedron.faces[:2], [[0, 1, 2], [0, 2, 3]])
+    polygon = Polygon(corners[quads[2]])
+    np.testing.assert_array_equal(polygon.vertices, corners[quads[2]])
+    self.assertEqual(polygon.faces, [[0, 1, 2], [0, 2, 3]])
+    # a face with a repeated vertex keeps its first position only
+    polyhedron = Polyhedron([Polygon(np.array([[0, 0, 0], [1, 1, 0], [0, 0, 0]], dtype=float))])
+    self.assertEqual(polyhedron.faces, [[0, 1, -1]])
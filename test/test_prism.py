@@ -0,0 +1,55 @@
+"""
+TestPrism
+Copyright © 2025 MMT department-University of Cadiz
+Project Coder Pilar Monsalvete pilar.monsalvete@uca.es
+"""
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+import shapely
+
+from helpers.attributes.prism import Prism
+from imports.geometry.geojson import Geojson
+
+
+class TestPrism(TestCase):
+  """
+  Prism closed-form geometry tests
+  """
+
+  def test_prism(self):
+    """
+    The volume, centroid and bounds of an L shaped prism with a courtyard bridged into its footprint
+    """
+    outer = np.array([[0, 0], [0, 20], [10, 20], [10, 10], [30, 10], [30, 0]], dtype=float)
+    courtyard = np.array([[2, 2], [6, 2], [6, 6], [2, 6]], dtype=float)
+    # the footprint is clockwise and the courtyard, bridged from the first vertex, counterclockwise
+    footprint = np.concatenate((outer[:1], courtyard, courtyard[:1], outer))
+    prism = Prism([footprint], 1, 6)
+    expected = shapely.Polygon(outer, [courtyard])
+    self.assertAlmostEqual(expected.area, prism.areas[0])
+    self.assertAlmostEqual(expected.area * 5, prism.volume)
+    np.testing.assert_allclose([expected.centroid.x, expected.centroid.y, 3.5], prism.centroid)
+    self.assertEqual([0, 0, 1], prism.lower_corner)
+    self.assertEqual([30, 20, 6], prism.upper_corner)
+    self.assertEqual(6, prism.max_z)
+    # a degenerated footprint has no volume nor centroid
+    prism = Prism([np.array([[0, 0], [10, 0], [20, 0]], dtype=float)], 0, 3)
+    self.assertEqual(0, prism.volume)
+    self.assertIsNone(prism.centroid)
+
+  def test_extruded_buildings(self):
+    """
+    The extruded buildings use their prism for the volume, centroid and height
+    """
+    file = Path(Path(__file__).parent / 'data' / 'buildings.geojson').resolve()
+    district = Geojson(file, extrusion_height_field='height', type_of_feature_field='feature_type').district
+    for building in district.buildings:
+      self.assertIsNotNone(building.prism)
+      footprint = np.asarray(building.grounds[0].perimeter_polygon.coordinates)
+      expected = shapely.Polygon(footprint[:, :2])
+      self.assertAlmostEqual(expected.area * building.max_height, building.volume)
+      np.testing.assert_allclose([expected.centroid.x, expected.centroid.y, building.max_height / 2],
+                                 building.centroid)
+      self.assertAlmostEqual(building.upper_corner[2], building.max_height)